@@ -0,0 +1,288 @@
+"""Benchmark the SecuritySpy integration against a fake SecuritySpy server.
+
+Runs a minimal Home Assistant core with the integration from this
+repository, drives it with the fake server and prints the results as JSON.
+
+    python3 -m benchmarks.benchmark --cameras 40 --event-rate 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from homeassistant import auth, bootstrap, loader
+from homeassistant.components.camera import async_get_image
+from homeassistant.config_entries import ConfigEntries
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_USERNAME,
+    EVENT_STATE_CHANGED,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+
+from .fake_server import SERVER_UUID, FakeSecuritySpyServer
+
+DOMAIN = "securityspy"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentiles(values: list[float]) -> dict:
+    """Return latency percentiles in milliseconds."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def _pick(fraction):
+        return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50": _pick(0.50),
+        "p90": _pick(0.90),
+        "p99": _pick(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+async def _async_start_hass(config_dir: str, http_port: int) -> HomeAssistant:
+    """Start a minimal Home Assistant core."""
+    os.makedirs(os.path.join(config_dir, "custom_components"))
+    os.symlink(
+        os.path.join(REPO_ROOT, "custom_components", DOMAIN),
+        os.path.join(config_dir, "custom_components", DOMAIN),
+    )
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    hass.auth = await auth.auth_manager_from_config(
+        hass, [{"type": "homeassistant"}], []
+    )
+    await async_setup_component(hass, "homeassistant", {})
+    await async_setup_component(
+        hass, "http", {"http": {"server_host": "127.0.0.1", "server_port": http_port}}
+    )
+    await hass.async_start()
+    return hass
+
+
+async def _async_wait_for(predicate, timeout: float) -> bool:
+    """Wait until predicate returns True."""
+    end = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > end:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+async def async_run(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results."""
+    server = FakeSecuritySpyServer(
+        cameras=args.cameras, snapshot_size=args.snapshot_size
+    )
+    await server.start()
+    hass = await _async_start_hass(tempfile.mkdtemp(), args.http_port)
+    results: dict = {
+        "cameras": args.cameras,
+        "event_rate": args.event_rate,
+        "snapshot_size": args.snapshot_size,
+    }
+
+    # Setup time and memory, set up through the config flow.
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    start = time.monotonic()
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": "user"},
+        data={
+            CONF_HOST: server.host,
+            CONF_PORT: server.port,
+            CONF_USERNAME: "benchmark",
+            CONF_PASSWORD: "benchmark",
+        },
+    )
+    await hass.async_block_till_done()
+    results["setup_seconds"] = round(time.monotonic() - start, 4)
+    memory_after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    results["memory_per_camera_bytes"] = int(
+        (memory_after - memory_before) / max(args.cameras, 1)
+    )
+    entry = result["result"]
+    entity_registry = er.async_get(hass)
+    entities = er.async_entries_for_config_entry(entity_registry, entry.entry_id)
+    results["entities"] = len(entities)
+
+    if not await _async_wait_for(lambda: server.connected_streams > 0, 15):
+        raise RuntimeError("The integration never connected to the event stream")
+
+    # Event to state latency, measured on the motion binary sensors.
+    motion_entities = {
+        registry_entry.entity_id: registry_entry.unique_id.rsplit("_", 1)[1]
+        for registry_entry in entities
+        if registry_entry.unique_id.startswith(f"motion_{SERVER_UUID}_")
+    }
+    latencies: list[float] = []
+    state_writes = 0
+
+    @callback
+    def _async_state_changed(event: Event) -> None:
+        nonlocal state_writes
+        state_writes += 1
+        camera = motion_entities.get(event.data["entity_id"])
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if (
+            camera is None
+            or new_state is None
+            or (old_state is not None and old_state.state == new_state.state)
+        ):
+            return
+        latencies.append(time.monotonic() - server.event_sent[camera])
+
+    unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, _async_state_changed)
+    events_sent = 0
+    interval = 1 / args.event_rate
+    end = time.monotonic() + args.duration
+    next_send = time.monotonic()
+    while time.monotonic() < end:
+        await server.toggle_motion(str(events_sent % args.cameras))
+        events_sent += 1
+        next_send += interval
+        await asyncio.sleep(max(next_send - time.monotonic(), 0))
+    await asyncio.sleep(0.5)
+    await hass.async_block_till_done()
+    unsub()
+    results["events"] = {
+        "sent": events_sent,
+        "state_writes": state_writes,
+        "state_writes_per_event": round(state_writes / max(events_sent, 1), 3),
+        "latency_ms": _percentiles(latencies),
+    }
+
+    # Snapshot throughput with concurrent viewers.
+    camera_entities = [
+        registry_entry.entity_id
+        for registry_entry in entities
+        if registry_entry.domain == "camera"
+    ]
+    nvr_requests_before = server.requests.get("/image", 0)
+    served = 0
+    served_bytes = 0
+    snapshot_latencies: list[float] = []
+    end = time.monotonic() + args.snapshot_duration
+
+    async def _async_viewer() -> None:
+        nonlocal served, served_bytes
+        while time.monotonic() < end:
+            started = time.monotonic()
+            image = await async_get_image(
+                hass,
+                random.choice(camera_entities),
+                width=random.choice((None, 320, 640)),
+            )
+            snapshot_latencies.append(time.monotonic() - started)
+            served += 1
+            served_bytes += len(image.content)
+            # Cache hits never suspend, let the other viewers run.
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(_async_viewer() for _ in range(args.viewers)))
+    results["snapshots"] = {
+        "viewers": args.viewers,
+        "served": served,
+        "per_second": round(served / args.snapshot_duration, 2),
+        "mb_per_second": round(served_bytes / args.snapshot_duration / 1e6, 3),
+        "nvr_requests": server.requests.get("/image", 0) - nvr_requests_before,
+        "latency_ms": _percentiles(snapshot_latencies),
+    }
+
+    # Commands, a record motion switch toggle per camera and one bulk arm.
+    switch_entities = [
+        registry_entry.entity_id
+        for registry_entry in entities
+        if registry_entry.unique_id.startswith(f"record_motion_{SERVER_UUID}_")
+    ]
+    command_latencies: list[float] = []
+    toggles_failed = 0
+    for entity_id in switch_entities:
+        for service, state in (("turn_off", "off"), ("turn_on", "on")):
+            started = time.monotonic()
+            await hass.services.async_call(
+                "switch", service, {"entity_id": entity_id}, blocking=True
+            )
+            command_latencies.append(time.monotonic() - started)
+            if hass.states.get(entity_id).state != state:
+                toggles_failed += 1
+    started = time.monotonic()
+    bulk = await hass.services.async_call(
+        DOMAIN,
+        "set_arm_mode_bulk",
+        {"entity_id": camera_entities, "modes": ["on_motion"], "enabled": True},
+        blocking=True,
+        return_response=True,
+    )
+    results["commands"] = {
+        "toggles": len(command_latencies),
+        "toggles_failed": toggles_failed,
+        "toggle_latency_ms": _percentiles(command_latencies),
+        "bulk_succeeded": bulk["succeeded"],
+        "bulk_failed": bulk["failed"],
+        "bulk_ms": round((time.monotonic() - started) * 1000, 3),
+    }
+    if toggles_failed or bulk["failed"]:
+        raise RuntimeError(f"Commands failed: {results['commands']}")
+
+    secspy_data = hass.data[DOMAIN][entry.entry_id]["secspy_data"]
+    results["coordinator"] = {
+        "callbacks_fired": secspy_data.callbacks_fired,
+        "callbacks_skipped": secspy_data.callbacks_skipped,
+        "ingest": secspy_data.event_coalescer.metrics,
+    }
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop()
+    await server.stop()
+    return results
+
+
+def main() -> int:
+    """Parse arguments, run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cameras", type=int, default=10)
+    parser.add_argument("--event-rate", type=float, default=20, help="Events per second")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of events")
+    parser.add_argument("--snapshot-size", type=int, default=100_000, help="Bytes")
+    parser.add_argument("--snapshot-duration", type=float, default=5)
+    parser.add_argument("--viewers", type=int, default=10)
+    parser.add_argument("--http-port", type=int, default=18123)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_run(args))
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    sys.stdout.write(output + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
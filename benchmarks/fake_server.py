@@ -0,0 +1,208 @@
+"""A stand-in SecuritySpy server for benchmarks.
+
+Serves just enough of the SecuritySpy web API for pysecspy and the
+integration: systemInfo, image, ++video, eventStream, setSchedule,
+ptz/command and the recording download endpoints.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from aiohttp import web
+
+SERVER_UUID = "00:11:22:33:44:55"
+SERVER_VERSION = "5.5.0"
+
+
+class FakeSecuritySpyServer:
+    """Serve a configurable number of fake cameras."""
+
+    def __init__(
+        self,
+        cameras: int = 10,
+        snapshot_size: int = 100_000,
+        video_fps: float = 10,
+        recording_size: int = 5_000_000,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """Initialize the server."""
+        self.cameras = cameras
+        self.video_fps = video_fps
+        self.host = host
+        self.port = port
+        # Something that looks like a JPEG: SOI marker, payload, EOI marker.
+        self.snapshot = b"\xff\xd8" + os.urandom(max(snapshot_size - 4, 0)) + b"\xff\xd9"
+        self.recording = os.urandom(recording_size)
+        self.requests: dict[str, int] = {}
+        # Monotonic send time of the last motion event per camera number.
+        self.event_sent: dict[str, float] = {}
+        self._streams: list[web.StreamResponse] = []
+        self._video_streams = 0
+        self._stream_tasks: set[asyncio.Task] = set()
+        self._sequence = 0
+        self._motion: dict[str, bool] = {}
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        """Start serving."""
+        app = web.Application()
+        app.router.add_get("/systemInfo", self._system_info)
+        app.router.add_get("/image", self._image)
+        app.router.add_get("/++video", self._video)
+        app.router.add_get("/eventStream", self._event_stream)
+        app.router.add_get("/setSchedule", self._ok)
+        app.router.add_get("/setPreset", self._ok)
+        app.router.add_get("/ptz/command", self._ok)
+        app.router.add_get("/download", self._download_list)
+        app.router.add_get("/recordings/{name}", self._recording)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        for task in self._stream_tasks:
+            task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @property
+    def connected_streams(self) -> int:
+        """Return the number of connected event streams."""
+        return len(self._streams)
+
+    @property
+    def connected_video_streams(self) -> int:
+        """Return the number of connected MJPEG streams."""
+        return self._video_streams
+
+    async def toggle_motion(self, camera: str) -> bool:
+        """Send a motion start or end event for a camera, return the new state."""
+        motion = not self._motion.get(camera, False)
+        self._motion[camera] = motion
+        action = "TRIGGER_M 9" if motion else "MOTION_END"
+        self.event_sent[camera] = time.monotonic()
+        await self.send_event(f"{camera} {action}")
+        return motion
+
+    async def send_event(self, message: str) -> None:
+        """Send a raw event line to all connected event streams."""
+        self._sequence += 1
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        line = f"{stamp} {self._sequence} {message}\r\n".encode()
+        for stream in list(self._streams):
+            try:
+                await stream.write(line)
+            except ConnectionError:
+                self._streams.remove(stream)
+
+    def _count(self, request: web.Request) -> None:
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+
+    async def _ok(self, request: web.Request) -> web.Response:
+        self._count(request)
+        return web.Response(text="OK")
+
+    async def _system_info(self, request: web.Request) -> web.Response:
+        self._count(request)
+        cameras = "".join(
+            f"""<camera>
+<number>{number}</number>
+<connected>yes</connected>
+<width>1920</width>
+<height>1080</height>
+<mode-c>disarmed</mode-c>
+<mode-m>armed</mode-m>
+<mode-a>armed</mode-a>
+<current-fps>15.0</current-fps>
+<video-format>H.264</video-format>
+<name>Camera {number}</name>
+<devicetype>Network</devicetype>
+<devicename>Benchmark Camera</devicename>
+<address>10.0.0.{number % 250 + 1}</address>
+<timesincelastmotion>1000</timesincelastmotion>
+<ptzcapabilities>{31 if number % 4 == 0 else 0}</ptzcapabilities>
+<preset-name-1>Door</preset-name-1>
+<preset-name-2>Garden</preset-name-2>
+</camera>"""
+            for number in range(self.cameras)
+        )
+        body = f"""<?xml version="1.0" encoding="utf-8"?>
+<system>
+<server>
+<name>SecuritySpy</name>
+<version>{SERVER_VERSION}</version>
+<uuid>{SERVER_UUID}</uuid>
+<server-name>Benchmark</server-name>
+<ip1>{self.host}</ip1>
+</server>
+<cameralist>{cameras}</cameralist>
+</system>"""
+        return web.Response(text=body, content_type="text/xml")
+
+    async def _image(self, request: web.Request) -> web.Response:
+        self._count(request)
+        return web.Response(body=self.snapshot, content_type="image/jpeg")
+
+    async def _video(self, request: web.Request) -> web.StreamResponse:
+        self._count(request)
+        response = web.StreamResponse()
+        response.content_type = "multipart/x-mixed-replace; boundary=videoframe"
+        await response.prepare(request)
+        self._video_streams += 1
+        try:
+            while True:
+                await response.write(
+                    b"--videoframe\r\nContent-Type: image/jpeg\r\n"
+                    + f"Content-Length: {len(self.snapshot)}\r\n\r\n".encode()
+                    + self.snapshot
+                    + b"\r\n"
+                )
+                await asyncio.sleep(1 / self.video_fps)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._video_streams -= 1
+        return response
+
+    async def _download_list(self, request: web.Request) -> web.Response:
+        self._count(request)
+        camera = request.query.get("cameraNum", "0")
+        body = f"""<?xml version="1.0" encoding="utf-8"?>
+<feed>
+<entry>
+<title>Camera {camera} motion</title>
+<link href="recordings/camera{camera}.m4v"/>
+</entry>
+</feed>"""
+        return web.Response(text=body, content_type="text/xml")
+
+    async def _recording(self, request: web.Request) -> web.Response:
+        self._count(request)
+        return web.Response(body=self.recording, content_type="video/mp4")
+
+    async def _event_stream(self, request: web.Request) -> web.StreamResponse:
+        self._count(request)
+        response = web.StreamResponse()
+        response.content_type = "multipart/x-mixed-replace"
+        await response.prepare(request)
+        self._streams.append(response)
+        task = asyncio.current_task()
+        self._stream_tasks.add(task)
+        try:
+            while True:
+                await asyncio.sleep(10)
+                await response.write(b"\r\n")
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if response in self._streams:
+                self._streams.remove(response)
+            self._stream_tasks.discard(task)
+        return response
@@ -1,41 +1,123 @@
 """SecuritySpy Platform."""
 from __future__ import annotations
 
+import asyncio
+from datetime import timedelta
 import logging
 
-from aiohttp.client_exceptions import ServerDisconnectedError
+from aiohttp.client_exceptions import ClientError, ServerDisconnectedError
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_FILENAME,
     CONF_ID,
     CONF_HOST,
     CONF_PORT,
     CONF_USERNAME,
     CONF_PASSWORD,
 )
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
 import homeassistant.helpers.device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+import homeassistant.helpers.entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
 from pysecspy.errors import InvalidCredentials, RequestError
 from pysecspy.secspy_server import SecSpyServer
 from pysecspy.const import SERVER_ID
 
 from .const import (
     CONF_DISABLE_RTSP,
+    CONF_ATTRIBUTE_BUDGET,
+    CONF_CAMERAS,
+    CONF_CLIP_CACHE_SIZE,
+    CONF_ENABLED,
+    CONF_END,
+    CONF_ENTITY_TYPES,
+    CONF_EVENT_HISTORY,
+    CONF_EVENT_HISTORY_PERSIST,
+    CONF_LIMIT,
+    CONF_MAX_EVENTS,
+    CONF_MAX_CONNECTIONS,
+    CONF_MAX_PARALLEL,
     CONF_MIN_SCORE,
+    CONF_MODES,
+    CONF_MOTION_FRAMES,
+    CONF_OBJECT,
+    CONF_REQUEST_TIMEOUT,
+    CONF_RETRIES,
+    CONF_SAMPLE_RATE,
+    CONF_SNAPSHOT_TTL,
+    CONF_START,
+    CONF_WITHIN,
     CONFIG_OPTIONS,
+    DATA_CLIP_VIEW,
+    DATA_DOWNLOAD_SEMAPHORE,
     DEFAULT_BRAND,
+    DEFAULT_CLIP_CACHE_SIZE,
+    DEFAULT_EVENT_HISTORY,
+    DEFAULT_MAX_CONNECTIONS,
     DEFAULT_MIN_SCORE,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_SNAPSHOT_TTL,
+    DEVICE_TYPE_FIELDS,
     DOMAIN,
+    ENTITY_TYPES,
+    LIVE_OPTIONS,
+    PLATFORM_ENTITY_TYPES,
     SECURITYSPY_PLATFORMS,
     SERVICE_ENABLE_SCHEDULE_PRESET,
+    SERVICE_QUERY_EVENTS,
+    SERVICE_SET_ARM_MODE_BULK,
+    SERVICE_START_PROFILE,
+    SERVICE_STOP_PROFILE,
     ENABLE_SCHEDULE_PRESET_SCHEMA,
+    EVENTS_STORAGE_KEY,
+    QUERY_EVENTS_SCHEMA,
+    SET_ARM_MODE_BULK_SCHEMA,
+    START_PROFILE_SCHEMA,
+    SIGNAL_OPTIONS_UPDATED,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    MAX_CONCURRENT_DOWNLOADS,
     MIN_SECSPY_VERSION,
 )
+from .clips import ClipCache, SecuritySpyClipView, async_remove_clip_cache
 from .data import SecuritySpyData
+from .frames import MotionFrameBuffer
+from .history import EventHistory
+from .hub import SecuritySpyHub, async_acquire_hub, async_release_hub
+from .metrics import instrument_server
+from .models import ServerState
+from .profile import async_get_profiler
+from .ptz import SecuritySpyPTZ
+from .recording import SecuritySpyRecordings
+from .session import async_get_session_manager
+from .snapshot import ScaledImageCache
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds before the first retry of a failed bulk arm command, doubled per retry.
+BULK_RETRY_DELAY = 0.5
+# Seconds between connection attempts after starting from the cache.
+CACHED_RETRY_DELAY = 10
+CACHED_RETRY_MAX_DELAY = 300
+# Seconds to wait before writing the cache.
+CACHE_SAVE_DELAY = 10
+# Device fields left out of the cache, they carry the auth token and the
+# first device list brings them back.
+CACHE_EXCLUDED_FIELDS = ("live_stream", "latest_image")
+# Interval of the device list refresh that finds added and removed cameras.
+DEVICE_LIST_INTERVAL = timedelta(minutes=5)
+
 
 @callback
 def _async_import_options_from_data_if_missing(hass: HomeAssistant, entry: ConfigEntry):
@@ -56,7 +138,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up the SecuritySpy config entries."""
     _async_import_options_from_data_if_missing(hass, entry)
 
-    session = async_create_clientsession(hass)
+    host = entry.data[CONF_HOST]
+    port = entry.data[CONF_PORT]
+    session_manager = async_get_session_manager(hass)
+    session = session_manager.async_acquire(
+        host,
+        port,
+        entry.options.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+        entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+    )
+    hub = async_acquire_hub(hass, entry)
+    try:
+        setup_ok = await _async_setup_server(hass, entry, session, hub)
+    except Exception:
+        await async_release_hub(hass, hub, entry)
+        session_manager.async_release(host, port)
+        raise
+    if not setup_ok:
+        await async_release_hub(hass, hub, entry)
+        session_manager.async_release(host, port)
+    return setup_ok
+
+
+async def _async_setup_server(
+    hass: HomeAssistant, entry: ConfigEntry, session, hub: SecuritySpyHub
+):
+    """Connect to the SecuritySpy server and set up the platforms."""
     securityspyserver = SecSpyServer(
         session,
         entry.data[CONF_HOST],
@@ -66,44 +173,110 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry.options.get(CONF_MIN_SCORE, DEFAULT_MIN_SCORE),
     )
 
-    secspy_data = SecuritySpyData(hass, securityspyserver)
-
-    try:
-        server_info = await securityspyserver.get_server_information()
-    except InvalidCredentials as unauthex:
-        _LOGGER.error("Could not authorize against SecuritySpy. Error: %s.", unauthex)
-        return False
-    except (RequestError, ServerDisconnectedError) as notreadyerror:
-        raise ConfigEntryNotReady from notreadyerror
-
-    if server_info["server_version"] < MIN_SECSPY_VERSION:
-        _LOGGER.error(
-            "This version of SecuritySpy is too old. Please upgrade to minimum V%s and try again.",
-            MIN_SECSPY_VERSION,
+    history = None
+    if history_size := entry.options.get(CONF_EVENT_HISTORY, DEFAULT_EVENT_HISTORY):
+        history = EventHistory(
+            hass,
+            entry.entry_id,
+            history_size,
+            entry.options.get(CONF_EVENT_HISTORY_PERSIST, False),
         )
-        return False
-
-    if entry.unique_id is None:
-        hass.config_entries.async_update_entry(entry, unique_id=server_info[SERVER_ID])
+        await history.async_load()
+
+    frames = None
+    if frame_count := entry.options.get(CONF_MOTION_FRAMES, 0):
+        frames = MotionFrameBuffer(hass, securityspyserver, frame_count)
+
+    # The event stream and device list come from the hub shared by all
+    # entries for this server, commands use the entry's own credentials.
+    secspy_data = SecuritySpyData(hass, hub, history, frames)
+    hub.async_attach(entry, securityspyserver)
+    instrument_server(securityspyserver, secspy_data.metrics, secspy_data.profiler)
+    store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry.entry_id))
+    cache = await store.async_load()
+
+    if cache is None:
+        server_info = await _async_connect_server(
+            hass, entry, securityspyserver, secspy_data
+        )
+        if server_info is None:
+            return False
+        secspy_data.server.update(server_info)
+        _async_save_cache(store, secspy_data)
+    else:
+        # Start from the last known state, the server is contacted in the
+        # background and the entities become available once it answers.
+        _LOGGER.debug("Starting %s from cached server information", entry.title)
+        secspy_data.async_restore(cache["server_info"], cache["devices"])
+
+    secspy_data.entity_key = entry.unique_id
+    update_listener = entry.add_update_listener(_async_options_updated)
 
-    await secspy_data.async_setup()
-    if not secspy_data.last_update_success:
-        raise ConfigEntryNotReady
+    # Downloads share one semaphore across all SecuritySpy servers.
+    download_semaphore = hass.data.setdefault(
+        DATA_DOWNLOAD_SEMAPHORE, asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    )
 
-    update_listener = entry.add_update_listener(_async_options_updated)
+    recordings = SecuritySpyRecordings(hass, securityspyserver, download_semaphore)
+    clips = ClipCache(
+        hass,
+        recordings,
+        entry.entry_id,
+        entry.options.get(CONF_CLIP_CACHE_SIZE, DEFAULT_CLIP_CACHE_SIZE) * 1024 * 1024,
+    )
+    await clips.async_setup()
+    if DATA_CLIP_VIEW not in hass.data:
+        # Views can't be removed, the view serves every entry.
+        hass.http.register_view(SecuritySpyClipView(hass))
+        hass.data[DATA_CLIP_VIEW] = True
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = securityspyserver
     hass.data[DOMAIN][entry.entry_id] = {
         "secspy_data": secspy_data,
+        "hub": hub,
         "nvr": securityspyserver,
-        "server_info": server_info,
+        "recordings": recordings,
+        "clips": clips,
+        "server_info": secspy_data.server,
+        "ptz": SecuritySpyPTZ(hass, securityspyserver),
+        "scaled_images": ScaledImageCache(hass),
         "update_listener": update_listener,
+        "config": dict(entry.data),
+        "options": dict(entry.options),
         "disable_stream": entry.options.get(CONF_DISABLE_RTSP, False),
+        "snapshot_ttl": entry.options.get(CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL),
+        "attribute_budget": entry.options.get(CONF_ATTRIBUTE_BUDGET, False),
+        "cameras": set(entry.options.get(CONF_CAMERAS, [])),
+        "entity_types": set(entry.options.get(CONF_ENTITY_TYPES, ENTITY_TYPES)),
     }
 
-    await _async_get_or_create_nvr_device_in_registry(hass, entry, server_info)
+    await _async_get_or_create_nvr_device_in_registry(hass, entry, secspy_data.server)
+    _async_remove_excluded_entities(hass, entry, hass.data[DOMAIN][entry.entry_id])
+
+    @callback
+    def _async_devices_changed(added, removed):
+        """Remove the entities and devices of removed cameras.
+
+        The platforms add the entities of added cameras themselves.
+        """
+        if removed:
+            _async_remove_cameras(hass, entry, set(removed))
+
+    entry.async_on_unload(secspy_data.async_subscribe_devices(_async_devices_changed))
+    entry.async_on_unload(
+        async_track_time_interval(hass, secspy_data.async_refresh, DEVICE_LIST_INTERVAL)
+    )
     await hass.config_entries.async_forward_entry_setups(entry, SECURITYSPY_PLATFORMS)
 
+    if cache is not None:
+        entry.async_create_background_task(
+            hass,
+            _async_connect_cached_server(
+                hass, entry, securityspyserver, secspy_data, store
+            ),
+            f"{DOMAIN} connect {entry.title}",
+        )
+
     # hass.config_entries.async_setup_platforms(entry, SECURITYSPY_PLATFORMS)
 
     async def async_enable_schedule_preset(service_entries):
@@ -118,24 +291,251 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         schema=ENABLE_SCHEDULE_PRESET_SCHEMA,
     )
 
+    async def async_set_arm_mode_bulk(call: ServiceCall) -> ServiceResponse:
+        """Call Set Arm Mode Bulk Handler."""
+        return await async_handle_set_arm_mode_bulk(hass, call)
+
+    if not hass.services.has_service(DOMAIN, SERVICE_SET_ARM_MODE_BULK):
+        _LOGGER.debug("Creating Service: Set Arm Mode Bulk")
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_SET_ARM_MODE_BULK,
+            async_set_arm_mode_bulk,
+            schema=SET_ARM_MODE_BULK_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+    async def async_query_events(call: ServiceCall) -> ServiceResponse:
+        """Call Query Events Handler."""
+        return async_handle_query_events(hass, call)
+
+    if not hass.services.has_service(DOMAIN, SERVICE_QUERY_EVENTS):
+        _LOGGER.debug("Creating Service: Query Events")
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_QUERY_EVENTS,
+            async_query_events,
+            schema=QUERY_EVENTS_SCHEMA,
+            supports_response=SupportsResponse.ONLY,
+        )
+
+    async def async_start_profile(call: ServiceCall) -> None:
+        """Call Start Profile Handler."""
+        async_handle_start_profile(hass, call)
+
+    async def async_stop_profile(call: ServiceCall) -> ServiceResponse:
+        """Call Stop Profile Handler."""
+        return await async_handle_stop_profile(hass, call)
+
+    if not hass.services.has_service(DOMAIN, SERVICE_START_PROFILE):
+        _LOGGER.debug("Creating Service: Start and Stop Profile")
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_START_PROFILE,
+            async_start_profile,
+            schema=START_PROFILE_SCHEMA,
+        )
+        hass.services.async_register(
+            DOMAIN,
+            SERVICE_STOP_PROFILE,
+            async_stop_profile,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
     return True
 
 
+async def _async_connect_server(
+    hass: HomeAssistant, entry: ConfigEntry, securityspyserver, secspy_data
+):
+    """Fetch the server information and the devices concurrently.
+
+    Returns the server information, or None if the entry can not be set up.
+    """
+    server_info, setup_error = await asyncio.gather(
+        securityspyserver.get_server_information(),
+        secspy_data.async_setup(),
+        return_exceptions=True,
+    )
+    try:
+        if isinstance(server_info, InvalidCredentials):
+            _LOGGER.error(
+                "Could not authorize against SecuritySpy. Error: %s.", server_info
+            )
+            return None
+        if isinstance(server_info, RequestError | ServerDisconnectedError):
+            raise ConfigEntryNotReady from server_info
+        if isinstance(server_info, BaseException):
+            raise server_info
+        if isinstance(setup_error, BaseException):
+            raise setup_error
+    except BaseException:
+        await secspy_data.async_stop()
+        raise
+
+    if server_info["server_version"] < MIN_SECSPY_VERSION:
+        _LOGGER.error(
+            "This version of SecuritySpy is too old. Please upgrade to minimum V%s and try again.",
+            MIN_SECSPY_VERSION,
+        )
+        await secspy_data.async_stop()
+        return None
+
+    if entry.unique_id is None:
+        hass.config_entries.async_update_entry(entry, unique_id=server_info[SERVER_ID])
+
+    if not secspy_data.last_update_success:
+        await secspy_data.async_stop()
+        raise ConfigEntryNotReady
+
+    return server_info
+
+
+async def _async_connect_cached_server(
+    hass: HomeAssistant, entry: ConfigEntry, securityspyserver, secspy_data, store
+) -> None:
+    """Connect an entry started from the cache, retrying until it succeeds."""
+    delay = CACHED_RETRY_DELAY
+    while True:
+        try:
+            server_info, _ = await asyncio.gather(
+                securityspyserver.get_server_information(),
+                secspy_data.async_setup(),
+            )
+        except InvalidCredentials as unauthex:
+            # Reload without the cache, so the setup fails where it shows.
+            _LOGGER.error(
+                "Could not authorize against SecuritySpy. Error: %s.", unauthex
+            )
+            await store.async_remove()
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+            return
+        except (RequestError, ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("SecuritySpy not ready, retrying in %ss: %s", delay, err)
+        else:
+            if secspy_data.last_update_success:
+                break
+            _LOGGER.debug("SecuritySpy not ready, retrying in %ss", delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, CACHED_RETRY_MAX_DELAY)
+
+    if server_info["server_version"] < MIN_SECSPY_VERSION:
+        _LOGGER.error(
+            "This version of SecuritySpy is too old. Please upgrade to minimum V%s and try again.",
+            MIN_SECSPY_VERSION,
+        )
+        return
+
+    server_version = secspy_data.server.server_version
+    secspy_data.async_update_server(server_info)
+    if secspy_data.server.server_version != server_version:
+        await _async_get_or_create_nvr_device_in_registry(
+            hass, entry, secspy_data.server
+        )
+    _async_save_cache(store, secspy_data)
+
+
+@callback
+def _async_save_cache(store: Store, secspy_data) -> None:
+    """Save the server information and devices for the next start."""
+    store.async_delay_save(
+        lambda: {
+            "server_info": secspy_data.server.as_dict(),
+            "devices": {
+                device_id: {
+                    field: value
+                    for field, value in device.as_dict().items()
+                    if field not in CACHE_EXCLUDED_FIELDS
+                }
+                for device_id, device in secspy_data.data.items()
+            },
+        },
+        CACHE_SAVE_DELAY,
+    )
+
+
 async def _async_get_or_create_nvr_device_in_registry(
-    hass: HomeAssistant, entry: ConfigEntry, nvr
+    hass: HomeAssistant, entry: ConfigEntry, nvr: ServerState
 ) -> None:
     device_registry = dr.async_get(hass)
     device_registry.async_get_or_create(
         config_entry_id=entry.entry_id,
-        connections={(dr.CONNECTION_NETWORK_MAC, nvr["server_id"])},
-        identifiers={(DOMAIN, nvr["server_id"])},
+        connections={(dr.CONNECTION_NETWORK_MAC, nvr.server_id)},
+        identifiers={(DOMAIN, nvr.server_id)},
         manufacturer=DEFAULT_BRAND,
         name=entry.data[CONF_ID],
         model="Max OSX Computer",
-        sw_version=nvr["server_version"],
+        sw_version=nvr.server_version,
     )
 
 
+@callback
+def _async_remove_excluded_entities(
+    hass: HomeAssistant, entry: ConfigEntry, entry_data: dict
+) -> None:
+    """Remove entities of cameras and entity types left out in the options.
+
+    Cameras left out entirely are also detached from the entry.
+    """
+    cameras = entry_data["cameras"]
+    entity_types = entry_data["entity_types"]
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    excluded_devices = set()
+    for registry_entry in er.async_entries_for_config_entry(
+        entity_registry, entry.entry_id
+    ):
+        device = device_registry.async_get(registry_entry.device_id or "")
+        camera_id = device and _camera_id_of_device(device)
+        if camera_id is None:
+            # Server entities are always created.
+            continue
+        if cameras and camera_id not in cameras:
+            excluded_devices.add(device.id)
+        elif PLATFORM_ENTITY_TYPES[registry_entry.domain] in entity_types:
+            continue
+        _LOGGER.debug("Removing excluded entity %s", registry_entry.entity_id)
+        entity_registry.async_remove(registry_entry.entity_id)
+
+    for device_id in excluded_devices:
+        device_registry.async_update_device(
+            device_id, remove_config_entry_id=entry.entry_id
+        )
+
+
+@callback
+def _async_remove_cameras(
+    hass: HomeAssistant, entry: ConfigEntry, camera_ids: set[str]
+) -> None:
+    """Remove the entities of cameras and detach their devices from the entry."""
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        if _camera_id_of_device(device) not in camera_ids:
+            continue
+        for registry_entry in er.async_entries_for_device(
+            entity_registry, device.id, include_disabled_entities=True
+        ):
+            if registry_entry.config_entry_id == entry.entry_id:
+                entity_registry.async_remove(registry_entry.entity_id)
+        _LOGGER.debug("Removing device %s of a removed camera", device.name)
+        device_registry.async_update_device(
+            device.id, remove_config_entry_id=entry.entry_id
+        )
+
+
+def _camera_id_of_device(device: dr.DeviceEntry) -> str | None:
+    """Return the SecuritySpy camera number of a camera device."""
+    if any(identifier[0] == DOMAIN for identifier in device.identifiers):
+        # The NVR.
+        return None
+    for connection_type, connection in device.connections:
+        if connection_type == dr.CONNECTION_NETWORK_MAC and "_" in connection:
+            # Camera connections are made up as address_cameranumber.
+            return connection.rsplit("_", 1)[1]
+    return None
+
+
 async def async_handle_enable_schedule_preset(hass, entry, service_entries):
     """Enable Schedule Preset."""
 
@@ -147,9 +547,215 @@ async def async_handle_enable_schedule_preset(hass, entry, service_entries):
     await secspy.enable_schedule_preset(preset_id)
 
 
+@callback
+def _async_get_camera(hass, entity_registry, entity_id):
+    """Return the entry data and camera id of a camera entity, or None."""
+    registry_entry = entity_registry.async_get(entity_id)
+    if (
+        registry_entry is None
+        or registry_entry.platform != DOMAIN
+        or registry_entry.domain != "camera"
+    ):
+        return None
+    entry_data = hass.data[DOMAIN].get(registry_entry.config_entry_id)
+    if entry_data is None:
+        return None
+    # Camera unique ids are <camera id>_<server id>, with _<username> added
+    # for extra entries of the same server.
+    return entry_data, registry_entry.unique_id.split("_", 1)[0]
+
+
+@callback
+def async_handle_query_events(hass, call):
+    """Query the motion event history of the cameras.
+
+    Returns the newest events first, from all cameras if none are given.
+    """
+    entity_registry = er.async_get(hass)
+    start = 0.0
+    if CONF_WITHIN in call.data:
+        start = (dt_util.utcnow() - call.data[CONF_WITHIN]).timestamp()
+    elif CONF_START in call.data:
+        start = dt_util.as_utc(call.data[CONF_START]).timestamp()
+    end = float("inf")
+    if CONF_END in call.data:
+        end = dt_util.as_utc(call.data[CONF_END]).timestamp()
+    limit = call.data[CONF_LIMIT]
+
+    # Camera ids per entry, None for all cameras of the entry.
+    queries = {}
+    if ATTR_ENTITY_ID in call.data:
+        for entity_id in call.data[ATTR_ENTITY_ID]:
+            camera = _async_get_camera(hass, entity_registry, entity_id)
+            if camera is None:
+                raise HomeAssistantError(f"{entity_id} is not a SecuritySpy camera")
+            entry_data, device_id = camera
+            queries.setdefault(id(entry_data), (entry_data, []))[1].append(device_id)
+    else:
+        queries = {
+            id(entry_data): (entry_data, None)
+            for entry_data in hass.data[DOMAIN].values()
+        }
+
+    events = []
+    for entry_data, camera_ids in queries.values():
+        history = entry_data["secspy_data"].history
+        if history is None:
+            continue
+        entity_key = (
+            entry_data["secspy_data"].entity_key or entry_data["server_info"].server_id
+        )
+        for event in history.async_query(
+            camera_ids, call.data.get(CONF_OBJECT), start, end, limit
+        ):
+            events.append(
+                {
+                    "entity_id": entity_registry.async_get_entity_id(
+                        "camera", DOMAIN, f"{event.camera_id}_{entity_key}"
+                    ),
+                    **event.as_dict(),
+                }
+            )
+
+    events.sort(key=lambda event: event["start"], reverse=True)
+    return {"events": events[:limit]}
+
+
+@callback
+def async_handle_start_profile(hass, call):
+    """Start recording a trace of the work of the integration."""
+    filename = call.data[CONF_FILENAME]
+    if not hass.config.is_allowed_path(filename):
+        raise HomeAssistantError(f"Can't write {filename}, no access to path!")
+    profiler = async_get_profiler(hass)
+    if profiler.active:
+        raise HomeAssistantError(f"Already profiling to {profiler.filename}")
+    profiler.async_start(
+        filename, call.data[CONF_MAX_EVENTS], call.data[CONF_SAMPLE_RATE]
+    )
+
+
+async def async_handle_stop_profile(hass, call):
+    """Stop recording the trace and write it to its file."""
+    profiler = async_get_profiler(hass)
+    if not profiler.active:
+        raise HomeAssistantError("Not profiling, start_profile was not called")
+    try:
+        return await profiler.async_stop()
+    except OSError as err:
+        raise HomeAssistantError(f"Can't write trace to file: {err}") from err
+
+
+async def async_handle_set_arm_mode_bulk(hass, call):
+    """Set Arm Modes on many cameras concurrently.
+
+    Commands run in parallel up to max_parallel, failed commands are
+    retried, and each involved server is refreshed once at the end.
+    """
+    modes = call.data[CONF_MODES]
+    enabled = call.data[CONF_ENABLED]
+    retries = call.data[CONF_RETRIES]
+    semaphore = asyncio.Semaphore(call.data[CONF_MAX_PARALLEL])
+    entity_registry = er.async_get(hass)
+
+    results = {}
+    commands = []
+    for entity_id in call.data[ATTR_ENTITY_ID]:
+        camera = _async_get_camera(hass, entity_registry, entity_id)
+        if camera is None:
+            results[entity_id] = {"error": "Not a SecuritySpy camera"}
+            continue
+        entry_data, device_id = camera
+        results[entity_id] = {}
+        commands.extend((entity_id, entry_data, device_id, mode) for mode in modes)
+
+    async def _async_set_arm_mode(entry_data, device_id, mode):
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(BULK_RETRY_DELAY * 2 ** (attempt - 1))
+            try:
+                async with semaphore:
+                    await entry_data["nvr"].set_arm_mode(device_id, mode, enabled)
+            except (RequestError, ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug(
+                    "Set Arm Mode %s failed for camera %s (attempt %s): %s",
+                    mode,
+                    device_id,
+                    attempt + 1,
+                    err,
+                )
+                error = str(err) or type(err).__name__
+            else:
+                return None
+        return error
+
+    errors = await asyncio.gather(
+        *(
+            _async_set_arm_mode(entry_data, device_id, mode)
+            for _, entry_data, device_id, mode in commands
+        )
+    )
+
+    refresh = {}
+    succeeded = 0
+    for (entity_id, entry_data, device_id, mode), error in zip(commands, errors):
+        results[entity_id][mode] = error or "ok"
+        if error is None:
+            succeeded += 1
+            (field,) = DEVICE_TYPE_FIELDS[mode]
+            entry_data["secspy_data"].async_set_device_field(device_id, field, enabled)
+        refresh[id(entry_data)] = entry_data["secspy_data"]
+
+    for secspy_data in refresh.values():
+        await secspy_data.async_refresh(force_camera_update=True)
+
+    _LOGGER.debug("Set Arm Mode Bulk: %s of %s succeeded", succeeded, len(commands))
+    return {
+        "succeeded": succeeded,
+        "failed": len(commands) - succeeded,
+        "cameras": results,
+    }
+
+
 async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry):
-    """Update options."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Update options.
+
+    Options in LIVE_OPTIONS are applied to the running server, data and
+    entities. Connection changes and other options reload the entry.
+    """
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    old_options = entry_data["options"]
+    changed = {
+        key
+        for key in entry.options.keys() | old_options.keys()
+        if entry.options.get(key) != old_options.get(key)
+    }
+    if dict(entry.data) != entry_data["config"] or not changed.issubset(
+        LIVE_OPTIONS
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    if not changed:
+        return
+
+    _LOGGER.debug("Applying options %s without reload", changed)
+    entry_data["options"] = dict(entry.options)
+    entry_data["disable_stream"] = entry.options.get(CONF_DISABLE_RTSP, False)
+    entry_data["snapshot_ttl"] = entry.options.get(
+        CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL
+    )
+    async_dispatcher_send(
+        hass, SIGNAL_OPTIONS_UPDATED.format(entry.entry_id), entry_data
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached server information, events and clips of a removed entry."""
+    await Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry.entry_id)).async_remove()
+    await Store(
+        hass, STORAGE_VERSION, EVENTS_STORAGE_KEY.format(entry.entry_id)
+    ).async_remove()
+    await async_remove_clip_cache(hass, entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -162,7 +768,22 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_remove(DOMAIN, SERVICE_ENABLE_SCHEDULE_PRESET)
         entry_data = hass.data[DOMAIN][entry.entry_id]
         await entry_data["secspy_data"].async_stop()
+        entry_data["ptz"].async_stop()
+        if entry_data["secspy_data"].history is not None:
+            await entry_data["secspy_data"].history.async_stop()
+        if entry_data["secspy_data"].frames is not None:
+            entry_data["secspy_data"].frames.async_stop()
         entry_data["update_listener"]()
         hass.data[DOMAIN].pop(entry.entry_id)
+        await async_release_hub(hass, entry_data["hub"], entry)
+        async_get_session_manager(hass).async_release(
+            entry.data[CONF_HOST], entry.data[CONF_PORT]
+        )
+        if not hass.data[DOMAIN]:
+            hass.services.async_remove(DOMAIN, SERVICE_SET_ARM_MODE_BULK)
+            hass.services.async_remove(DOMAIN, SERVICE_QUERY_EVENTS)
+            hass.services.async_remove(DOMAIN, SERVICE_START_PROFILE)
+            hass.services.async_remove(DOMAIN, SERVICE_STOP_PROFILE)
+            async_get_profiler(hass).async_cancel()
 
     return unload_ok
@@ -13,7 +13,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     ATTR_LAST_TRIP_TIME,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
@@ -23,8 +23,9 @@ from .const import (
     ATTR_EVENT_SCORE_HUMAN,
     ATTR_EVENT_SCORE_VEHICLE,
     DOMAIN,
+    ENTITY_TYPE_BINARY_SENSOR,
 )
-from .entity import SecuritySpyEntity
+from .entity import SecuritySpyEntity, async_add_camera_entities
 from .models import SecSpyRequiredKeysMixin
 
 
@@ -41,6 +42,14 @@ BINARY_SENSORS: tuple[SecSpyBinaryEntityDescription, ...] = (
         name="Motion",
         device_class=BinarySensorDeviceClass.MOTION,
         trigger_field="event_on",
+        update_fields=("last_motion",),
+        attribute_fields=(
+            ATTR_EVENT_LENGTH,
+            ATTR_EVENT_OBJECT,
+            ATTR_EVENT_SCORE_ANIMAL,
+            ATTR_EVENT_SCORE_HUMAN,
+            ATTR_EVENT_SCORE_VEHICLE,
+        ),
     ),
     SecSpyBinaryEntityDescription(
         key="online",
@@ -62,29 +71,38 @@ async def async_setup_entry(
     secspy_object = entry_data["nvr"]
     secspy_data = entry_data["secspy_data"]
     server_info = entry_data["server_info"]
-    if not secspy_data.data:
-        return
-
-    sensors = []
-    for device_id in secspy_data.data:
-        device_data = secspy_data.data[device_id]
-        for description in BINARY_SENSORS:
-            sensors.append(
-                SecuritySpyBinarySensor(
-                    secspy_object,
-                    secspy_data,
-                    server_info,
-                    device_id,
-                    description,
+    attribute_budget = entry_data["attribute_budget"]
+
+    @callback
+    def _async_create_entities(device_ids):
+        sensors = []
+        for device_id in device_ids:
+            device_data = secspy_data.data[device_id]
+            for description in BINARY_SENSORS:
+                sensors.append(
+                    SecuritySpyBinarySensor(
+                        secspy_object,
+                        secspy_data,
+                        server_info,
+                        device_id,
+                        description,
+                        attribute_budget,
+                    )
                 )
-            )
-            _LOGGER.debug(
-                "Adding binary sensor entity %s for Camera %s",
-                description.name,
-                device_data["name"],
-            )
+                _LOGGER.debug(
+                    "Adding binary sensor entity %s for Camera %s",
+                    description.name,
+                    device_data.name,
+                )
+        return sensors
 
-    async_add_entities(sensors)
+    async_add_camera_entities(
+        entry,
+        entry_data,
+        ENTITY_TYPE_BINARY_SENSOR,
+        _async_create_entities,
+        async_add_entities,
+    )
 
 
 class SecuritySpyBinarySensor(SecuritySpyEntity, BinarySensorEntity):
@@ -97,34 +115,40 @@ class SecuritySpyBinarySensor(SecuritySpyEntity, BinarySensorEntity):
         server_info,
         device_id,
         description: SecSpyBinaryEntityDescription,
+        attribute_budget=False,
     ):
         """Initialize the Binary Sensor."""
         super().__init__(
-            secspy_object, secspy_data, server_info, device_id, description.key
+            secspy_object,
+            secspy_data,
+            server_info,
+            device_id,
+            description.key,
+            attribute_budget,
         )
         self._description = description
-        self._attr_name = f"{self._device_data['name']} {self._description.name}"
+        self._update_fields = description.subscribed_fields(attribute_budget)
+        self._attr_name = f"{self._device.name} {self._description.name}"
         self._attr_device_class = self._description.device_class
         self._attr_icon = self._description.icon
 
     @property
     def is_on(self):
         """Return true if the binary sensor is on."""
-        return self._device_data[self._description.trigger_field]
+        return self._device.get(self._description.trigger_field)
 
     @property
     def extra_state_attributes(self):
         """Return the device state attributes."""
         if self._description.device_class == BinarySensorDeviceClass.MOTION:
-            return {
+            attributes = {
                 **super().extra_state_attributes,
-                ATTR_LAST_TRIP_TIME: self._device_data["last_motion"],
-                ATTR_EVENT_LENGTH: self._device_data["event_length"],
-                ATTR_EVENT_OBJECT: self._device_data["event_object"],
-                ATTR_EVENT_SCORE_ANIMAL: self._device_data[ATTR_EVENT_SCORE_ANIMAL],
-                ATTR_EVENT_SCORE_HUMAN: self._device_data[ATTR_EVENT_SCORE_HUMAN],
-                ATTR_EVENT_SCORE_VEHICLE: self._device_data[ATTR_EVENT_SCORE_VEHICLE],
+                ATTR_LAST_TRIP_TIME: self._device.last_motion,
             }
+            if not self._attribute_budget:
+                for field in self._description.attribute_fields:
+                    attributes[field] = self._device.get(field)
+            return attributes
         return {
             **super().extra_state_attributes,
         }
@@ -6,24 +6,21 @@ import logging
 from homeassistant.components.button import ButtonDeviceClass, ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+import homeassistant.helpers.entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .entity import SecuritySpyEntity
+from .const import CONF_PTZ_BUTTONS, DOMAIN, ENTITY_TYPE_PTZ
+from .entity import SecuritySpyEntity, async_add_camera_entities
+from .ptz import (
+    PTZ_MOVE_SPEED,
+    PTZ_MOVES,
+    PTZ_PRESET_OFFSET,
+    PTZ_PRESET_SPEED,
+    ptz_supported,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-_PTZ_STANDARDS = {
-    "Left": 1,
-    "Right": 2,
-    "Up": 3,
-    "Down": 4,
-    "Zoom In": 5,
-    "Zoom Out": 6,
-    "Stop": 99,
-}
-
-
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
@@ -32,43 +29,59 @@ async def async_setup_entry(
     secspy_object = entry_data["nvr"]
     secspy_data = entry_data["secspy_data"]
     server_info = entry_data["server_info"]
-    if not secspy_data.data:
+    ptz = entry_data["ptz"]
+
+    if not entry.options.get(CONF_PTZ_BUTTONS, True):
+        # PTZ is controlled by the select entity, drop buttons created earlier.
+        entity_registry = er.async_get(hass)
+        for registry_entry in er.async_entries_for_config_entry(
+            entity_registry, entry.entry_id
+        ):
+            if registry_entry.domain == "button":
+                entity_registry.async_remove(registry_entry.entity_id)
         return
 
-    sensors = []
-    for device_id in secspy_data.data:
-        device_data = secspy_data.data[device_id]
-        if int(device_data["ptz_capabilities"]) > 0:
-            preset_index = 12
-            for preset in device_data["ptz_presets"]:
-                sensors.append(
-                    SecuritySpyButtonEntity(
-                        secspy_object,
-                        secspy_data,
-                        server_info,
-                        device_id,
-                        preset,
-                        preset_index,
+    @callback
+    def _async_create_entities(device_ids):
+        sensors = []
+        for device_id in device_ids:
+            device_data = secspy_data.data[device_id]
+            if ptz_supported(device_data):
+                for index, preset in enumerate(device_data.ptz_presets):
+                    sensors.append(
+                        SecuritySpyButtonEntity(
+                            secspy_object,
+                            secspy_data,
+                            server_info,
+                            device_id,
+                            preset,
+                            PTZ_PRESET_OFFSET + index,
+                            PTZ_PRESET_SPEED,
+                            ptz,
+                        )
                     )
-                )
-                preset_index += 1
-                _LOGGER.debug(
-                    "Adding Button Entity %s to Camera %s", preset, device_data["name"]
-                )
-            # Add Standrad Buttons to each ptz capable Camera
-            for name, std_preset in _PTZ_STANDARDS.items():
-                sensors.append(
-                    SecuritySpyButtonEntity(
-                        secspy_object,
-                        secspy_data,
-                        server_info,
-                        device_id,
-                        name,
-                        std_preset,
+                    _LOGGER.debug(
+                        "Adding Button Entity %s to Camera %s", preset, device_data.name
                     )
-                )
+                # Add Standrad Buttons to each ptz capable Camera
+                for name, command in PTZ_MOVES.items():
+                    sensors.append(
+                        SecuritySpyButtonEntity(
+                            secspy_object,
+                            secspy_data,
+                            server_info,
+                            device_id,
+                            name,
+                            command,
+                            PTZ_MOVE_SPEED,
+                            ptz,
+                        )
+                    )
+        return sensors
 
-    async_add_entities(sensors)
+    async_add_camera_entities(
+        entry, entry_data, ENTITY_TYPE_PTZ, _async_create_entities, async_add_entities
+    )
 
     return True
 
@@ -76,6 +89,9 @@ async def async_setup_entry(
 class SecuritySpyButtonEntity(SecuritySpyEntity, ButtonEntity):
     """A SecuritySpy Button entity."""
 
+    # Buttons have no state depending on device data.
+    _update_fields = frozenset()
+
     def __init__(
         self,
         secspy_object,
@@ -83,25 +99,22 @@ class SecuritySpyButtonEntity(SecuritySpyEntity, ButtonEntity):
         server_info,
         device_id,
         preset_id,
-        preset_index,
+        command,
+        speed,
+        ptz,
     ):
         """Initialize the Button entity."""
         super().__init__(secspy_object, secspy_data, server_info, device_id, preset_id)
         self._preset_id = preset_id
-        self._preset_index = preset_index
-        self._attr_name = f"{self._device_data['name']} {preset_id.capitalize()}"
+        # The command is fixed when the button is made, presets can share a
+        # name with each other or with a move.
+        self._command = command
+        self._speed = speed
+        self._ptz = ptz
+        self._attr_name = f"{self._device.name} {preset_id.capitalize()}"
         self._attr_device_class = ButtonDeviceClass.UPDATE
 
     @callback
     async def async_press(self) -> None:
         """Press the button."""
-
-        _LOGGER.debug(
-            "Activating PTZ command %s for Camera %s", self._preset_id, self._device_id
-        )
-        _preset_speed = 80
-        if self._preset_index < 12:
-            _preset_speed = 40
-        await self.secspy.set_ptz_preset(
-            self._device_id, self._preset_index, _preset_speed
-        )
+        self._ptz.async_send(self._device_id, self._command, self._speed)
@@ -1,27 +1,45 @@
 """Camera definitions for SecuritySpy."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 
+from aiohttp.client_exceptions import ClientError
 from homeassistant.components.camera import Camera, CameraEntityFeature
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_LAST_TRIP_TIME
 from homeassistant.helpers import entity_platform
-from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.core import HomeAssistant, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from pysecspy.errors import RequestError
 
 from .const import (
     DOMAIN,
     DEFAULT_BRAND,
+    ENTITY_TYPE_CAMERA,
     DOWNLOAD_LATEST_MOTION_RECORDING_SCHEMA,
+    GET_RECORDINGS_SCHEMA,
     ATTR_PRESET_ID,
     ATTR_PTZ_CAPABILITIES,
+    PTZ_MOVE_SCHEMA,
     RECORDING_TYPE_MOTION,
+    SAVE_MOTION_FRAMES_SCHEMA,
+    SERVICE_SAVE_MOTION_FRAMES,
     SERVICE_SET_ARM_MODE,
     SERVICE_DOWNLOAD_LATEST_MOTION_RECORDING,
+    SERVICE_GET_RECORDINGS,
+    SERVICE_PTZ_MOVE,
     SET_ARM_MODE_SCHEMA,
+    SIGNAL_OPTIONS_UPDATED,
 )
-from .entity import SecuritySpyEntity
+from .clips import ClipCache
+from .entity import SecuritySpyEntity, async_add_camera_entities
+from .mjpeg import MjpegBroadcaster
+from .ptz import ptz_supported
+from .snapshot import ScaledImageCache, SnapshotCache
 
 CONF_RTSP_TRANSPORT = "rtsp_transport"
 FFMPEG_OPTION_MAP = {CONF_RTSP_TRANSPORT: "rtsp_transport"}
@@ -38,21 +56,42 @@ async def async_setup_entry(
     secspy_object = entry_data["nvr"]
     secspy_data = entry_data["secspy_data"]
     server_info = entry_data["server_info"]
-    disable_stream = entry_data["disable_stream"]
-
-    if not secspy_data.data:
-        return
-
-    cameras = []
-    for camera_id in secspy_data.data:
-        cameras.append(
-            SecuritySpyCamera(
-                secspy_object, secspy_data, server_info, camera_id, disable_stream
+    attribute_budget = entry_data["attribute_budget"]
+    recordings = entry_data["recordings"]
+    ptz = entry_data["ptz"]
+    scaled_images = entry_data["scaled_images"]
+    clips = entry_data["clips"]
+
+    @callback
+    def _async_create_entities(device_ids):
+        cameras = []
+        for camera_id in device_ids:
+            cameras.append(
+                SecuritySpyCamera(
+                    secspy_object,
+                    secspy_data,
+                    server_info,
+                    camera_id,
+                    # Live options, cameras added later get the current ones.
+                    entry_data["disable_stream"],
+                    SnapshotCache(hass, entry_data["snapshot_ttl"]),
+                    recordings,
+                    ptz,
+                    scaled_images,
+                    clips,
+                    attribute_budget,
+                )
             )
-        )
-        _LOGGER.debug("Adding Camera Id: %s", camera_id)
-
-    async_add_entities(cameras)
+            _LOGGER.debug("Adding Camera Id: %s", camera_id)
+        return cameras
+
+    async_add_camera_entities(
+        entry,
+        entry_data,
+        ENTITY_TYPE_CAMERA,
+        _async_create_entities,
+        async_add_entities,
+    )
 
     platform = entity_platform.async_get_current_platform()
 
@@ -70,26 +109,156 @@ async def async_setup_entry(
         "async_download_latest_motion_recording",
     )
 
+    _LOGGER.debug("Creating Service: Get Recordings")
+    platform.async_register_entity_service(
+        SERVICE_GET_RECORDINGS,
+        GET_RECORDINGS_SCHEMA,
+        "async_get_recordings",
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    _LOGGER.debug("Creating Service: Save Motion Frames")
+    platform.async_register_entity_service(
+        SERVICE_SAVE_MOTION_FRAMES,
+        SAVE_MOTION_FRAMES_SCHEMA,
+        "async_save_motion_frames",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    _LOGGER.debug("Creating Service: PTZ Move")
+    platform.async_register_entity_service(
+        SERVICE_PTZ_MOVE,
+        PTZ_MOVE_SCHEMA,
+        "async_ptz_move",
+    )
+
 
 class SecuritySpyCamera(SecuritySpyEntity, Camera):
     """A SecuritySpy Camera."""
 
+    _unrecorded_attributes = SecuritySpyEntity._unrecorded_attributes | frozenset(
+        {ATTR_PRESET_ID, ATTR_PTZ_CAPABILITIES}
+    )
+
+    _update_fields = frozenset(
+        {
+            "event_online",
+            "last_motion",
+            "ptz_capabilities",
+            "recording_mode_c",
+            "recording_mode_m",
+        }
+    )
+
     def __init__(
-        self, secspy_object, secspy_data, server_info, camera_id, disable_stream
+        self,
+        secspy_object,
+        secspy_data,
+        server_info,
+        camera_id,
+        disable_stream,
+        snapshot_cache: SnapshotCache,
+        recordings,
+        ptz,
+        scaled_images: ScaledImageCache,
+        clips: ClipCache,
+        attribute_budget=False,
     ):
         """Initialize an SecuritySpy camera."""
-        super().__init__(secspy_object, secspy_data, server_info, camera_id, None)
-        self._name = self._device_data["name"]
-        self._stream_source = (
-            None if disable_stream else self._device_data["live_stream"]
+        super().__init__(
+            secspy_object, secspy_data, server_info, camera_id, None, attribute_budget
         )
+        self._name = self._device.name
+        self._disable_stream = disable_stream
+        self._stream_source = None if disable_stream else self._live_stream()
         self._last_image: bytes | None = None
+        self._snapshot_cache = snapshot_cache
+        self._scaled_images = scaled_images
+        self._recordings = recordings
+        self._clips = clips
+        self._ptz = ptz
+        self._mjpeg: MjpegBroadcaster | None = None
         if self._stream_source:
             self._attr_supported_features = CameraEntityFeature.STREAM
         else:
             self._attr_supported_features = CameraEntityFeature(0)
         self.stream_options[FFMPEG_OPTION_MAP[CONF_RTSP_TRANSPORT]] = "tcp"
 
+    async def async_added_to_hass(self):
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        credential = self.secspy.server_credential
+        self._mjpeg = MjpegBroadcaster(
+            self.hass,
+            f"http://{credential['host']}:{credential['port']}/++video"
+            f"?cameraNum={self._device_id}&auth={credential['token']}",
+        )
+        self.async_on_remove(self._mjpeg.async_stop)
+        self.async_on_remove(
+            self.secspy_data.async_subscribe_device_id(
+                self._device_id,
+                self._async_invalidate_snapshots,
+                frozenset({"event_on"}),
+            )
+        )
+        self.async_on_remove(
+            self.secspy_data.async_subscribe_device_id(
+                self._device_id,
+                self._async_live_stream_changed,
+                frozenset({"live_stream"}),
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_OPTIONS_UPDATED.format(self.platform.config_entry.entry_id),
+                self._async_options_updated,
+            )
+        )
+
+    def _live_stream(self):
+        """Return the stream url with this entry's own credentials.
+
+        The device data can come from another entry for the same server.
+        """
+        live_stream = self._device.live_stream
+        if live_stream is None:
+            return None
+        return live_stream.replace(
+            f"auth={self.secspy_data.server_credential['token']}",
+            f"auth={self.secspy.server_credential['token']}",
+        )
+
+    async def _async_options_updated(self, entry_data):
+        """Apply changed options without reloading."""
+        self._snapshot_cache.ttl = entry_data["snapshot_ttl"]
+        self._disable_stream = entry_data["disable_stream"]
+        await self._async_update_stream_source()
+
+    @callback
+    def _async_live_stream_changed(self):
+        """Pick up the stream url, cameras started from the cache have none."""
+        self.hass.async_create_task(self._async_update_stream_source())
+
+    async def _async_update_stream_source(self):
+        """Set the stream source, stopping a stream of the old one."""
+        stream_source = None if self._disable_stream else self._live_stream()
+        if stream_source != self._stream_source:
+            self._stream_source = stream_source
+            if self._stream_source:
+                self._attr_supported_features = CameraEntityFeature.STREAM
+            else:
+                self._attr_supported_features = CameraEntityFeature(0)
+            if self.stream is not None:
+                await self.stream.stop()
+                self.stream = None
+        self.async_write_ha_state()
+
+    @callback
+    def _async_invalidate_snapshots(self):
+        """Drop cached snapshots when a motion event starts or ends."""
+        self._snapshot_cache.invalidate()
+
     @property
     def name(self):
         """Return the name of this camera."""
@@ -98,7 +267,7 @@ class SecuritySpyCamera(SecuritySpyEntity, Camera):
     @property
     def motion_detection_enabled(self):
         """Camera Motion Detection Status."""
-        return self._device_data["recording_mode_m"]
+        return self._device.recording_mode_m
 
     @property
     def brand(self):
@@ -108,29 +277,35 @@ class SecuritySpyCamera(SecuritySpyEntity, Camera):
     @property
     def model(self):
         """Return the camera model."""
-        return self._model
+        return self._device.model
 
     @property
     def is_recording(self):
         """Return true if the device is recording."""
         return bool(
             (
-                self._device_data["recording_mode_c"]
-                or self._device_data["recording_mode_m"]
+                self._device.recording_mode_c
+                or self._device.recording_mode_m
             )
-            and self._device_data["event_online"]
+            and self._device.event_online
         )
 
     @property
     def extra_state_attributes(self):
         """Add additional Attributes to Camera."""
-        last_trip_time = self._device_data["last_motion"]
-
+        last_trip_time = self._device.last_motion
+
+        if self._attribute_budget:
+            # Schedule presets are on the server, PTZ on the select entity.
+            return {
+                **super().extra_state_attributes,
+                ATTR_LAST_TRIP_TIME: last_trip_time,
+            }
         return {
             **super().extra_state_attributes,
             ATTR_LAST_TRIP_TIME: last_trip_time,
-            ATTR_PRESET_ID: self._schedule_presets,
-            ATTR_PTZ_CAPABILITIES: self._device_data["ptz_capabilities"],
+            ATTR_PRESET_ID: self._server.schedule_presets,
+            ATTR_PTZ_CAPABILITIES: self._device.ptz_capabilities,
         }
 
     async def async_set_arm_mode(self, mode, enabled):
@@ -138,7 +313,17 @@ class SecuritySpyCamera(SecuritySpyEntity, Camera):
         _LOGGER.debug("Setting Arm Mode for %s to %s", mode, enabled)
         await self.secspy.set_arm_mode(self._device_id, mode, enabled)
 
-    async def async_download_latest_motion_recording(self, filename):
+    async def async_ptz_move(self, command, speed=None, duration=None):
+        """Move the camera to a preset or in a direction.
+
+        With a duration, a move is stopped again after that many seconds.
+        """
+        if not ptz_supported(self._device):
+            _LOGGER.error("Camera %s does not support PTZ", self.name)
+            return
+        self._ptz.async_move(self._device, command, speed, duration)
+
+    async def async_download_latest_motion_recording(self, filename, streaming=True):
         """Download and save latest motion recording."""
 
         if not self.hass.config.is_allowed_path(filename):
@@ -146,6 +331,19 @@ class SecuritySpyCamera(SecuritySpyEntity, Camera):
             _LOGGER.error("Can't write %s, no access to path!", filename)
             return
 
+        if streaming:
+            _LOGGER.debug("Streaming recording to %s", filename)
+            try:
+                found = await self._recordings.async_download_latest_motion_recording(
+                    self._device_id, filename, self.entity_id
+                )
+            except OSError as err:
+                _LOGGER.error("Can't write video to file: %s", err)
+                return
+            if not found:
+                _LOGGER.error("Last recording not found for Camera %s", self.name)
+            return
+
         video = await self.secspy.get_latest_motion_recording(self._device_id)
         if video is None:
             _LOGGER.error("Last recording not found for Camera %s", self.name)
@@ -153,10 +351,71 @@ class SecuritySpyCamera(SecuritySpyEntity, Camera):
 
         _LOGGER.debug("Saving recording in %s", filename)
         try:
-            await self.hass.async_add_executor_job(_write_file, filename, video)
+            await self.hass.async_add_executor_job(
+                self.secspy_data.profiler.wrap(_write_file, "write_file", "executor"),
+                filename,
+                video,
+            )
         except OSError as err:
             _LOGGER.error("Can't write video to file: %s", err)
 
+    async def async_get_recordings(self, start=None, end=None, limit=10):
+        """Return the motion recordings of the camera, newest first.
+
+        Each recording has a signed url served by Home Assistant, which
+        keeps the clip on disk after the first view and supports range
+        requests.
+        """
+        try:
+            recordings = await self._recordings.async_list_motion_recordings(
+                self._device_id, start, end, limit
+            )
+        except (RequestError, ClientError, asyncio.TimeoutError) as err:
+            raise HomeAssistantError(f"Can't list recordings: {err}") from err
+
+        result = []
+        for recording in recordings:
+            url, cached = self._clips.async_get_url(recording["path"])
+            result.append(
+                {
+                    "title": recording["title"],
+                    "updated": recording["updated"],
+                    "url": url,
+                    "cached": cached,
+                }
+            )
+        return {"recordings": result}
+
+    async def async_save_motion_frames(self, filename):
+        """Save the snapshots taken since motion started.
+
+        The frames are written to files named after filename with their
+        number added, the oldest frame being 1.
+        """
+        if not self.hass.config.is_allowed_path(filename):
+            raise HomeAssistantError(f"Can't write {filename}, no access to path!")
+        if self.secspy_data.frames is None:
+            raise HomeAssistantError("Snapshots on motion are turned off")
+
+        stem, suffix = os.path.splitext(filename)
+        saved = []
+        for number, frame in enumerate(
+            self.secspy_data.frames.async_get_frames(self._device_id), 1
+        ):
+            frame_filename = f"{stem}_{number}{suffix or '.jpg'}"
+            try:
+                await self.hass.async_add_executor_job(
+                    self.secspy_data.profiler.wrap(
+                        _write_file, "write_file", "executor"
+                    ),
+                    frame_filename,
+                    frame.image,
+                )
+            except OSError as err:
+                raise HomeAssistantError(f"Can't write image to file: {err}") from err
+            saved.append({"filename": frame_filename, **frame.as_dict()})
+        return {"frames": saved}
+
     async def async_enable_motion_detection(self):
         """Enable motion detection in camera."""
         if not await self.secspy.set_arm_mode(
@@ -176,13 +435,53 @@ class SecuritySpyCamera(SecuritySpyEntity, Camera):
     async def async_camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
-        """Return the Camera Image."""
-        if self._device_data["event_online"]:
-            last_image = await self.secspy.get_snapshot_image(
-                self._device_id, width, height
-            )
-            self._last_image = last_image
-            return self._last_image
+        """Return the Camera Image.
+
+        Smaller sizes are scaled here from the full size snapshot, so one
+        download per camera serves every thumbnail size. Without
+        libturbojpeg SecuritySpy scales them instead.
+        """
+        if not self._device.event_online:
+            return None
+        if (width is None and height is None) or self._scaled_images.available is False:
+            image = await self._async_snapshot(width, height)
+        else:
+            image = await self._async_scaled_snapshot(width, height)
+        if image is not None:
+            metrics = self.secspy_data.metrics
+            metrics.snapshots_served += 1
+            metrics.snapshot_bytes += len(image)
+        self._last_image = image
+        return self._last_image
+
+    async def _async_scaled_snapshot(self, width, height):
+        """Return a snapshot scaled here from the full size snapshot."""
+        image = await self._async_snapshot(None, None)
+        if image is None:
+            return None
+        scaled = await self._scaled_images.async_get(
+            (self._device_id,), image, width, height
+        )
+        if scaled is None:
+            scaled = await self._async_snapshot(width, height)
+        return scaled
+
+    async def _async_snapshot(self, width, height):
+        """Return a snapshot in the size SecuritySpy scaled it to."""
+        frames = self.secspy_data.frames
+        if width is None and height is None and frames is not None:
+            # Taken when motion started, as fresh as a cached snapshot.
+            image = frames.async_get_latest(self._device_id, self._snapshot_cache.ttl)
+            if image is not None:
+                return image
+        return await self._snapshot_cache.async_get(
+            (width, height),
+            lambda: self.secspy.get_snapshot_image(self._device_id, width, height),
+        )
+
+    async def handle_async_mjpeg_stream(self, request):
+        """Serve the live MJPEG stream, one upstream for all viewers."""
+        return await self._mjpeg.async_handle_request(request)
 
     async def stream_source(self):
         """Return the Stream Source."""
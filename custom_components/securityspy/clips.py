@@ -0,0 +1,234 @@
+"""Recording clips of SecuritySpy cameras, cached on disk and served over HTTP."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import contextlib
+from datetime import timedelta
+import hashlib
+import logging
+import os
+import shutil
+
+from aiohttp import web
+from aiohttp.client_exceptions import ClientError
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.http.auth import async_sign_path
+from homeassistant.core import HomeAssistant, callback
+from pysecspy.errors import RequestError
+
+from .const import DOMAIN
+from .recording import SecuritySpyRecordings
+
+_LOGGER = logging.getLogger(__name__)
+
+CLIP_URL = "/api/securityspy/clips/{entry_id}/{clip_id}"
+# Directory in the config directory holding a clip cache per config entry.
+CLIP_CACHE_DIR = "securityspy_clips"
+# Listed clips remembered per config entry, only those can be downloaded.
+MAX_KNOWN_CLIPS = 1000
+# Lifetime of the signed clip urls handed out by the service.
+CLIP_URL_EXPIRATION = timedelta(hours=24)
+
+
+class ClipCache:
+    """Keep downloaded recordings on disk in an LRU bounded by size.
+
+    Repeated views of a clip, like several people reviewing the same alarm,
+    are served from disk, and requests for a clip that is being downloaded
+    wait for that download. The clips are files, so the HTTP view answers
+    range requests from them directly.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        recordings: SecuritySpyRecordings,
+        entry_id: str,
+        max_bytes: int,
+    ):
+        """Initialize the cache."""
+        self._hass = hass
+        self._recordings = recordings
+        self._entry_id = entry_id
+        self.directory = clip_cache_directory(hass, entry_id)
+        self.max_bytes = max_bytes
+        self.size = 0
+        # Cached clip sizes, least recently used first.
+        self._clips: OrderedDict[str, int] = OrderedDict()
+        # Server paths of the listed clips.
+        self._paths: OrderedDict[str, str] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.downloaded_bytes = 0
+
+    @property
+    def metrics(self) -> dict:
+        """Return the cache metrics."""
+        return {
+            "clips": len(self._clips),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "downloaded_bytes": self.downloaded_bytes,
+        }
+
+    async def async_setup(self) -> None:
+        """Load the clips cached before a restart, oldest first."""
+        clips = await self._hass.async_add_executor_job(_scan_clips, self.directory)
+        for clip_id, size in clips:
+            self._clips[clip_id] = size
+            self.size += size
+        await self._async_evict()
+
+    @callback
+    def async_get_url(self, path: str) -> tuple[str, bool]:
+        """Return a signed url of a listed clip, and if it is cached."""
+        name = hashlib.sha256(path.encode()).hexdigest()[:24]
+        extension = os.path.splitext(path)[1].lower()
+        if extension[1:].isalnum() and len(extension) <= 6:
+            name += extension
+        self._paths[name] = path
+        self._paths.move_to_end(name)
+        while len(self._paths) > MAX_KNOWN_CLIPS:
+            self._paths.popitem(last=False)
+        url = async_sign_path(
+            self._hass,
+            CLIP_URL.format(entry_id=self._entry_id, clip_id=name),
+            CLIP_URL_EXPIRATION,
+        )
+        return url, name in self._clips
+
+    async def async_get_file(self, clip_id: str) -> str | None:
+        """Return the file of a clip, downloading it if needed.
+
+        Returns None for clips that were never listed.
+        """
+        if clip_id in self._clips:
+            self.hits += 1
+            self._clips.move_to_end(clip_id)
+            filename = os.path.join(self.directory, clip_id)
+            # The modification time keeps the order across restarts.
+            self._hass.async_add_executor_job(_touch_file, filename)
+            return filename
+
+        future = self._pending.get(clip_id)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        path = self._paths.get(clip_id)
+        if path is None:
+            return None
+        self.misses += 1
+        future = self._pending[clip_id] = self._hass.async_create_task(
+            self._async_download(clip_id, path)
+        )
+        # Shield so a viewer leaving does not cancel the shared download.
+        return await asyncio.shield(future)
+
+    async def _async_download(self, clip_id: str, path: str) -> str:
+        filename = os.path.join(self.directory, clip_id)
+        try:
+            await self._hass.async_add_executor_job(
+                os.makedirs, self.directory, 0o755, True
+            )
+            await self._recordings.async_download_recording(path, filename)
+            size = await self._hass.async_add_executor_job(os.path.getsize, filename)
+        finally:
+            self._pending.pop(clip_id, None)
+        _LOGGER.debug("Cached clip %s of %s bytes", path, size)
+        self.downloaded_bytes += size
+        self._clips[clip_id] = size
+        self.size += size
+        await self._async_evict()
+        return filename
+
+    async def _async_evict(self) -> None:
+        """Remove the least recently used clips over the size limit.
+
+        The newest clip is kept even if it is larger than the limit.
+        """
+        evicted = []
+        while self.size > self.max_bytes and len(self._clips) > 1:
+            clip_id, size = self._clips.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            evicted.append(os.path.join(self.directory, clip_id))
+        if evicted:
+            await self._hass.async_add_executor_job(_remove_files, evicted)
+
+
+class SecuritySpyClipView(HomeAssistantView):
+    """Serve recording clips from the clip cache."""
+
+    url = CLIP_URL
+    name = "api:securityspy:clip"
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the view."""
+        self._hass = hass
+
+    async def get(
+        self, request: web.Request, entry_id: str, clip_id: str
+    ) -> web.StreamResponse:
+        """Serve a clip, range requests included."""
+        entry_data = self._hass.data.get(DOMAIN, {}).get(entry_id)
+        if entry_data is None:
+            raise web.HTTPNotFound()
+        try:
+            filename = await entry_data["clips"].async_get_file(clip_id)
+        except (RequestError, ClientError, asyncio.TimeoutError, OSError) as err:
+            _LOGGER.warning("Can't fetch clip %s: %s", clip_id, err)
+            raise web.HTTPBadGateway() from err
+        if filename is None:
+            raise web.HTTPNotFound()
+        return web.FileResponse(filename)
+
+
+def clip_cache_directory(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the clip cache directory of a config entry."""
+    return hass.config.path(CLIP_CACHE_DIR, entry_id)
+
+
+def _scan_clips(directory: str) -> list[tuple[str, int]]:
+    """Executor helper to list the cached clips, least recently used first.
+
+    Partial downloads left by a restart are removed.
+    """
+    try:
+        entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+    except FileNotFoundError:
+        return []
+    for entry in entries:
+        if entry.name.startswith("."):
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
+    entries = [entry for entry in entries if not entry.name.startswith(".")]
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    return [(entry.name, entry.stat().st_size) for entry in entries]
+
+
+def _remove_files(filenames: list[str]) -> None:
+    """Executor helper to remove evicted clips."""
+    for filename in filenames:
+        with contextlib.suppress(OSError):
+            os.remove(filename)
+
+
+def _touch_file(filename: str) -> None:
+    """Executor helper to mark a clip as used."""
+    with contextlib.suppress(OSError):
+        os.utime(filename)
+
+
+async def async_remove_clip_cache(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the clip cache of a removed config entry."""
+    await hass.async_add_executor_job(
+        shutil.rmtree, clip_cache_directory(hass, entry_id), True
+    )
@@ -13,19 +13,38 @@ from homeassistant.const import (
     CONF_USERNAME,
 )
 from homeassistant.core import callback
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+import homeassistant.helpers.config_validation as cv
 from pysecspy.secspy_server import SecSpyServer
 from pysecspy.errors import InvalidCredentials, RequestError
 from pysecspy.const import SERVER_ID, SERVER_NAME
 
 from .const import (
+    CONF_ATTRIBUTE_BUDGET,
+    CONF_CAMERAS,
+    CONF_CLIP_CACHE_SIZE,
     CONF_DISABLE_RTSP,
+    CONF_ENTITY_TYPES,
+    CONF_EVENT_HISTORY,
+    CONF_EVENT_HISTORY_PERSIST,
+    CONF_MAX_CONNECTIONS,
     CONF_MIN_SCORE,
+    CONF_MOTION_FRAMES,
+    CONF_PTZ_BUTTONS,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SNAPSHOT_TTL,
     DEFAULT_PORT,
+    DEFAULT_CLIP_CACHE_SIZE,
+    DEFAULT_EVENT_HISTORY,
+    DEFAULT_MAX_CONNECTIONS,
     DEFAULT_MIN_SCORE,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_SNAPSHOT_TTL,
     MIN_SECSPY_VERSION,
     DOMAIN,
+    ENTITY_TYPES,
 )
+from .hub import hub_key
+from .session import async_get_session_manager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,7 +67,12 @@ class SecuritySpyFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         errors = {}
 
-        session = async_create_clientsession(self.hass)
+        # The session is kept for a while after release, so setting up the
+        # new entry reuses its connections.
+        session_manager = async_get_session_manager(self.hass)
+        session = session_manager.async_acquire(
+            user_input[CONF_HOST], user_input[CONF_PORT]
+        )
 
         secspy = SecSpyServer(
             session,
@@ -69,6 +93,8 @@ class SecuritySpyFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             _LOGGER.debug(ex)
             errors["base"] = "nvr_error"
             return await self._show_setup_form(errors)
+        finally:
+            session_manager.async_release(user_input[CONF_HOST], user_input[CONF_PORT])
 
         if server_info["server_version"] < MIN_SECSPY_VERSION:
             _LOGGER.error(
@@ -78,16 +104,32 @@ class SecuritySpyFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors["base"] = "version_old"
             return await self._show_setup_form(errors)
 
-        unique_id = server_info[SERVER_ID]
-        await self.async_set_unique_id(unique_id)
-        self._abort_if_unique_id_configured()
-
         server_name = server_info[SERVER_NAME]
         server_ip_address = server_info["server_ip_address"]
         id_name = f"{server_name} ({server_ip_address})"
 
+        # Another user on a configured server gets an entry of its own,
+        # sharing the event stream with the other entries of the server.
+        unique_id = server_info[SERVER_ID]
+        title = server_name
+        server_entries = [
+            entry
+            for entry in self._async_current_entries(include_ignore=False)
+            if entry.unique_id is not None and hub_key(entry) == unique_id
+        ]
+        if server_entries:
+            if any(
+                entry.data[CONF_USERNAME] == user_input[CONF_USERNAME]
+                for entry in server_entries
+            ):
+                return self.async_abort(reason="already_configured")
+            unique_id = f"{unique_id}_{user_input[CONF_USERNAME]}"
+            title = f"{server_name} ({user_input[CONF_USERNAME]})"
+        await self.async_set_unique_id(unique_id)
+        self._abort_if_unique_id_configured()
+
         return self.async_create_entry(
-            title=server_name,
+            title=title,
             data={
                 CONF_ID: id_name,
                 CONF_HOST: user_input[CONF_HOST],
@@ -98,6 +140,12 @@ class SecuritySpyFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             options={
                 CONF_DISABLE_RTSP: False,
                 CONF_MIN_SCORE: DEFAULT_MIN_SCORE,
+                CONF_SNAPSHOT_TTL: DEFAULT_SNAPSHOT_TTL,
+                CONF_PTZ_BUTTONS: False,
+                CONF_ATTRIBUTE_BUDGET: True,
+                CONF_EVENT_HISTORY: DEFAULT_EVENT_HISTORY,
+                CONF_EVENT_HISTORY_PERSIST: False,
+                CONF_MOTION_FRAMES: 0,
             },
         )
 
@@ -129,6 +177,20 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             return self.async_create_entry(title="", data=user_input)
 
+        # Cameras are named from the running entry, unknown ones by number.
+        cameras = {
+            camera_id: f"Camera {camera_id}"
+            for camera_id in self.config_entry.options.get(CONF_CAMERAS, [])
+        }
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        if entry_data is not None:
+            cameras.update(
+                {
+                    device_id: device.name or f"Camera {device_id}"
+                    for device_id, device in entry_data["secspy_data"].data.items()
+                }
+            )
+
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
@@ -137,6 +199,66 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_DISABLE_RTSP,
                         default=self.config_entry.options.get(CONF_DISABLE_RTSP, False),
                     ): bool,
+                    vol.Optional(
+                        CONF_SNAPSHOT_TTL,
+                        default=self.config_entry.options.get(
+                            CONF_SNAPSHOT_TTL, DEFAULT_SNAPSHOT_TTL
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                    vol.Optional(
+                        CONF_PTZ_BUTTONS,
+                        default=self.config_entry.options.get(CONF_PTZ_BUTTONS, True),
+                    ): bool,
+                    vol.Optional(
+                        CONF_CAMERAS,
+                        default=self.config_entry.options.get(CONF_CAMERAS, []),
+                    ): cv.multi_select(cameras),
+                    vol.Optional(
+                        CONF_ENTITY_TYPES,
+                        default=self.config_entry.options.get(
+                            CONF_ENTITY_TYPES, list(ENTITY_TYPES)
+                        ),
+                    ): cv.multi_select(ENTITY_TYPES),
+                    vol.Optional(
+                        CONF_ATTRIBUTE_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_ATTRIBUTE_BUDGET, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_EVENT_HISTORY,
+                        default=self.config_entry.options.get(
+                            CONF_EVENT_HISTORY, DEFAULT_EVENT_HISTORY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+                    vol.Optional(
+                        CONF_EVENT_HISTORY_PERSIST,
+                        default=self.config_entry.options.get(
+                            CONF_EVENT_HISTORY_PERSIST, False
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_MOTION_FRAMES,
+                        default=self.config_entry.options.get(CONF_MOTION_FRAMES, 0),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=30)),
+                    vol.Optional(
+                        CONF_CLIP_CACHE_SIZE,
+                        default=self.config_entry.options.get(
+                            CONF_CLIP_CACHE_SIZE, DEFAULT_CLIP_CACHE_SIZE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=100000)),
+                    vol.Optional(
+                        CONF_MAX_CONNECTIONS,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=50)),
+                    vol.Optional(
+                        CONF_REQUEST_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=300)),
                     # vol.Optional(
                     #     CONF_MIN_SCORE,
                     #     default=self.config_entry.options.get(
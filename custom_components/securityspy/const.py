@@ -16,18 +16,79 @@ UNIQUE_ID = "unique_id"
 
 DEFAULT_PORT = 8000
 DEFAULT_MIN_SCORE = 50
+DEFAULT_SNAPSHOT_TTL = 2
+DEFAULT_MAX_PARALLEL = 8
+DEFAULT_MAX_CONNECTIONS = 10
+DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_RETRIES = 2
+DEFAULT_EVENT_HISTORY = 100
+# Megabytes of recording clips kept on disk per config entry.
+DEFAULT_CLIP_CACHE_SIZE = 500
 DEFAULT_ATTRIBUTION = "Powered by SecuritySpy Server"
 DEFAULT_BRAND = "Ben Software"
 MIN_SECSPY_VERSION = "5.3.4"
 
+CONF_MAX_CONNECTIONS = "max_connections"
+CONF_MAX_PARALLEL = "max_parallel"
 CONF_MODE = "mode"
+CONF_MODES = "modes"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_RETRIES = "retries"
 CONF_ENABLED = "enabled"
 CONF_DISABLE_RTSP = "disable_rtsp"
 CONF_MIN_SCORE = "min_event_score"
+CONF_SNAPSHOT_TTL = "snapshot_ttl"
+CONF_STREAMING = "streaming"
+CONF_PTZ_BUTTONS = "ptz_buttons"
+CONF_ATTRIBUTE_BUDGET = "attribute_budget"
+CONF_CAMERAS = "cameras"
+CONF_CLIP_CACHE_SIZE = "clip_cache_size"
+CONF_ENTITY_TYPES = "entity_types"
+CONF_COMMAND = "command"
+CONF_DURATION = "duration"
+CONF_EVENT_HISTORY = "event_history"
+CONF_EVENT_HISTORY_PERSIST = "event_history_persist"
+CONF_MOTION_FRAMES = "motion_frames"
+CONF_OBJECT = "object"
+CONF_WITHIN = "within"
+CONF_START = "start"
+CONF_END = "end"
+CONF_LIMIT = "limit"
+CONF_SPEED = "speed"
+CONF_MAX_EVENTS = "max_events"
+CONF_SAMPLE_RATE = "sample_rate"
 CONFIG_OPTIONS = [
     CONF_DISABLE_RTSP,
     CONF_MIN_SCORE,
 ]
+# Options applied to the running entry, any other change reloads it.
+LIVE_OPTIONS = [
+    CONF_DISABLE_RTSP,
+    CONF_SNAPSHOT_TTL,
+]
+
+# Families of per camera entities that can be left out in the options.
+ENTITY_TYPE_BINARY_SENSOR = "binary_sensor"
+ENTITY_TYPE_CAMERA = "camera"
+ENTITY_TYPE_PTZ = "ptz"
+ENTITY_TYPE_SENSOR = "sensor"
+ENTITY_TYPE_SWITCH = "switch"
+ENTITY_TYPES = {
+    ENTITY_TYPE_CAMERA: "Camera",
+    ENTITY_TYPE_BINARY_SENSOR: "Motion and online sensors",
+    ENTITY_TYPE_SENSOR: "Recording mode and event sensors",
+    ENTITY_TYPE_SWITCH: "Recording mode switches",
+    ENTITY_TYPE_PTZ: "PTZ buttons and select",
+}
+# The entity type of the per camera entities of each platform.
+PLATFORM_ENTITY_TYPES = {
+    "binary_sensor": ENTITY_TYPE_BINARY_SENSOR,
+    "button": ENTITY_TYPE_PTZ,
+    "camera": ENTITY_TYPE_CAMERA,
+    "select": ENTITY_TYPE_PTZ,
+    "sensor": ENTITY_TYPE_SENSOR,
+    "switch": ENTITY_TYPE_SWITCH,
+}
 
 ATTR_BRAND = "brand"
 ATTR_EVENT_LENGTH = "event_length"
@@ -38,6 +99,19 @@ ATTR_EVENT_SCORE_VEHICLE = "event_score_vehicle"
 ATTR_PRESET_ID = "preset_id"
 ATTR_PTZ_CAPABILITIES = "ptz_capabilities"
 
+DATA_DOWNLOAD_SEMAPHORE = f"{DOMAIN}_download_semaphore"
+DATA_CLIP_VIEW = f"{DOMAIN}_clip_view"
+DATA_HUBS = f"{DOMAIN}_hubs"
+DATA_PROFILER = f"{DOMAIN}_profiler"
+DATA_SESSION_MANAGER = f"{DOMAIN}_session_manager"
+SIGNAL_OPTIONS_UPDATED = f"{DOMAIN}_options_updated_{{}}"
+MAX_CONCURRENT_DOWNLOADS = 2
+
+STORAGE_KEY = f"{DOMAIN}.{{}}"
+EVENTS_STORAGE_KEY = f"{DOMAIN}.{{}}.events"
+STORAGE_VERSION = 1
+EVENT_DOWNLOAD_PROGRESS = f"{DOMAIN}_download_progress"
+
 DEVICE_CLASS_DETECTION = "securityspy__detection"
 
 DEVICE_TYPE_CAMERA = "camera"
@@ -53,6 +127,15 @@ DEVICES_WITH_CAMERA = (
     DEVICE_TYPE_LOCAL,
 )
 
+# Device data fields each recording mode / detection description depends on.
+DEVICE_TYPE_FIELDS = {
+    RECORDING_TYPE_ACTION: ("recording_mode_a",),
+    RECORDING_TYPE_CONTINUOUS: ("recording_mode_c",),
+    RECORDING_TYPE_MOTION: ("recording_mode_m",),
+    # The scores are attributes, subscribed through attribute_fields.
+    DEVICE_CLASS_DETECTION: ("event_object",),
+}
+
 VALID_MODES = [
     RECORDING_TYPE_MOTION,
     RECORDING_TYPE_CONTINUOUS,
@@ -60,19 +143,73 @@ VALID_MODES = [
 ]
 SERVICE_DOWNLOAD_LATEST_MOTION_RECORDING = "download_latest_motion_recording"
 SERVICE_ENABLE_SCHEDULE_PRESET = "enable_schedule_preset"
+SERVICE_GET_RECORDINGS = "get_recordings"
+SERVICE_PTZ_MOVE = "ptz_move"
+SERVICE_QUERY_EVENTS = "query_events"
+SERVICE_SAVE_MOTION_FRAMES = "save_motion_frames"
 SERVICE_SET_ARM_MODE = "set_arm_mode"
-DOWNLOAD_LATEST_MOTION_RECORDING_SCHEMA = { vol.Required(ATTR_ENTITY_ID): cv.entity_ids, vol.Required(CONF_FILENAME): cv.string,}
+SERVICE_SET_ARM_MODE_BULK = "set_arm_mode_bulk"
+SERVICE_START_PROFILE = "start_profile"
+SERVICE_STOP_PROFILE = "stop_profile"
+DOWNLOAD_LATEST_MOTION_RECORDING_SCHEMA = { vol.Required(ATTR_ENTITY_ID): cv.entity_ids, vol.Required(CONF_FILENAME): cv.string, vol.Optional(CONF_STREAMING, default=True): cv.boolean,}
 ENABLE_SCHEDULE_PRESET_SCHEMA = vol.Schema(
     {
         vol.Required(ATTR_PRESET_ID): cv.string,
     }
 )
+GET_RECORDINGS_SCHEMA = {
+    vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+    vol.Optional(CONF_START): cv.datetime,
+    vol.Optional(CONF_END): cv.datetime,
+    vol.Optional(CONF_LIMIT, default=10): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=100)
+    ),
+}
+PTZ_MOVE_SCHEMA = { vol.Required(ATTR_ENTITY_ID): cv.entity_ids, vol.Required(CONF_COMMAND): cv.string, vol.Optional(CONF_SPEED): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)), vol.Optional(CONF_DURATION): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=60)),}
+SAVE_MOTION_FRAMES_SCHEMA = { vol.Required(ATTR_ENTITY_ID): cv.entity_ids, vol.Required(CONF_FILENAME): cv.string,}
 SET_ARM_MODE_SCHEMA = { vol.Required(ATTR_ENTITY_ID): cv.entity_ids, vol.Required(CONF_MODE): vol.In(VALID_MODES), vol.Required(CONF_ENABLED): cv.boolean,}
+SET_ARM_MODE_BULK_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required(CONF_MODES): vol.All(cv.ensure_list, [vol.In(VALID_MODES)]),
+        vol.Required(CONF_ENABLED): cv.boolean,
+        vol.Optional(CONF_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=32)
+        ),
+        vol.Optional(CONF_RETRIES, default=DEFAULT_RETRIES): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=5)
+        ),
+    }
+)
+QUERY_EVENTS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Optional(CONF_OBJECT): vol.In(["human", "vehicle", "animal"]),
+        vol.Exclusive(CONF_WITHIN, "period"): cv.time_period,
+        vol.Exclusive(CONF_START, "period"): cv.datetime,
+        vol.Optional(CONF_END): cv.datetime,
+        vol.Optional(CONF_LIMIT, default=100): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+    }
+)
+START_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_FILENAME): cv.string,
+        vol.Optional(CONF_MAX_EVENTS, default=100000): vol.All(
+            vol.Coerce(int), vol.Range(min=1000, max=1000000)
+        ),
+        vol.Optional(CONF_SAMPLE_RATE, default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0.01, max=1)
+        ),
+    }
+)
 SECURITYSPY_PLATFORMS = [
     "camera",
     "binary_sensor",
     "sensor",
     "switch",
     "button",
+    "select",
 ]
 
@@ -1,37 +1,90 @@
 """Base class for securityspy data."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 
+from aiohttp.client_exceptions import ClientError
 from homeassistant.core import callback
+from homeassistant.helpers.debounce import Debouncer
 
 from pysecspy.errors import RequestError
 
+from .history import HISTORY_FIELDS
+from .ingest import EventCoalescer
+from .metrics import SecuritySpyMetrics
+from .models import CameraState, ServerState
+from .profile import async_get_profiler
+
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds to collect device refresh requests before fetching once.
+REFRESH_COOLDOWN = 1.0
+
 
 class SecuritySpyData:
     """Coordinate updates."""
 
-    def __init__(self, hass, secspyserver):
+    def __init__(self, hass, secspyserver, history=None, frames=None):
         """Initialize an subscriber."""
         super().__init__()
         self._hass = hass
+        self.history = history
+        self.frames = frames
         self._secspyserver = secspyserver
-        self.data = {}
+        # Unique id prefix of the entities, the config entry's unique id.
+        self.entity_key = None
+        self.data: dict[str, CameraState] = {}
+        self.server = ServerState()
         self._subscriptions = {}
+        self._availability_listeners = []
+        self._device_listeners = []
         self._unsub_websocket = None
         self.last_update_success = False
+        self.callbacks_fired = 0
+        self.callbacks_skipped = 0
+        self.metrics = SecuritySpyMetrics()
+        self.profiler = async_get_profiler(hass)
+        self.event_coalescer = EventCoalescer(
+            hass, self._async_apply_updates, latency=self.metrics.event_latency
+        )
+        self._pending_refresh = set()
+        self._refresh_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=REFRESH_COOLDOWN,
+            immediate=False,
+            function=self._async_refresh_pending_devices,
+        )
+
+    @property
+    def server_credential(self):
+        """Return the credentials the device data was fetched with."""
+        return self._secspyserver.server_credential
 
     async def async_setup(self):
         """Subscribe and do the refresh."""
-        self._unsub_websocket = self._secspyserver.subscribe_websocket(
-            self._async_process_updates
-        )
+        if self._unsub_websocket is None:
+            self._unsub_websocket = self._secspyserver.subscribe_websocket(
+                self.event_coalescer.async_put
+            )
         await self.async_refresh()
 
+    @callback
+    def async_restore(self, server_info, devices):
+        """Load cached data, it is stale until the first refresh."""
+        self.server.update(server_info)
+        self.data = {
+            device_id: CameraState(device_id, data)
+            for device_id, data in devices.items()
+        }
+        self.last_update_success = False
+
     async def async_stop(self):
         """Stop processing data."""
+        self._refresh_debouncer.async_cancel()
+        self.event_coalescer.async_stop()
         if self._unsub_websocket:
             self._unsub_websocket()
             self._unsub_websocket = None
@@ -39,48 +92,248 @@ class SecuritySpyData:
 
     async def async_refresh(self, *_, force_camera_update=False):
         """Update the data."""
+        last_update_success = self.last_update_success
         try:
-            self._async_process_updates(
-                await self._secspyserver.update(force_camera_update=force_camera_update)
-            )
+            with self.metrics.timer("update"), self.profiler.async_span(
+                "update", "request"
+            ):
+                updates = await self._secspyserver.update(
+                    force_camera_update=force_camera_update
+                )
+            self._async_process_updates(updates)
+            if isinstance(updates, dict) and updates:
+                # The hub returns every camera, so missing ones were removed.
+                self._async_remove_devices(
+                    [device_id for device_id in self.data if device_id not in updates]
+                )
             self.last_update_success = True
-        except RequestError:
+        except (RequestError, ClientError, asyncio.TimeoutError):
+            self.metrics.count_error("update")
             if self.last_update_success:
                 _LOGGER.exception("Error while updating")
             self.last_update_success = False
 
+        if self.last_update_success != last_update_success:
+            # Availability changed, so every entity needs writing.
+            for device_id in self.data:
+                self.async_signal_device_id_update(device_id)
+            for update_callback in list(self._availability_listeners):
+                update_callback()
+
+    async def async_request_device_refresh(self, device_id):
+        """Request a refresh of a single device.
+
+        Requests arriving within REFRESH_COOLDOWN are served by one fetch.
+        """
+        self._pending_refresh.add(device_id)
+        await self._refresh_debouncer.async_call()
+
+    async def _async_refresh_pending_devices(self):
+        """Fetch the device list once and apply it to the pending devices.
+
+        SecuritySpy has no per camera endpoint, so the full list is fetched
+        but only the requested devices are diffed and signalled. The
+        debouncer drops calls made while a fetch runs, so devices requested
+        meanwhile are fetched again before returning.
+        """
+        while self._pending_refresh:
+            device_ids, self._pending_refresh = self._pending_refresh, set()
+            try:
+                with self.metrics.timer("update"), self.profiler.async_span(
+                    "update", "request"
+                ):
+                    updates = await self._secspyserver.update(
+                        force_camera_update=True
+                    )
+            except (RequestError, ClientError, asyncio.TimeoutError):
+                self.metrics.count_error("update")
+                _LOGGER.exception("Error while refreshing devices %s", device_ids)
+                return
+            if isinstance(updates, dict):
+                # Cameras new to the integration are added with the requested
+                # ones.
+                self._async_process_updates(
+                    {
+                        device_id: data
+                        for device_id, data in updates.items()
+                        if device_id in device_ids or device_id not in self.data
+                    }
+                )
+
+    @callback
+    def async_set_device_field(self, device_id, field, value):
+        """Optimistically set a device field, e.g. after sending a command."""
+        if device_id in self.data:
+            self._async_update_device(device_id, {field: value})
+
     @callback
     def _async_process_updates(self, updates):
         """Process update from the securityspy data."""
+        with self.profiler.span("process_updates", "data"):
+            # Pending websocket updates are older than a fetched update.
+            self.event_coalescer.async_flush()
+            self._async_apply_updates(updates)
+
+    @callback
+    def _async_apply_updates(self, updates):
+        """Apply updates to the device data."""
         if isinstance(updates, dict):
-            for device_id, data in updates.items():
-                self.data[device_id] = data
-                self.async_signal_device_id_update(device_id)
+            added = []
+            with self.profiler.span("apply_updates", "data", devices=len(updates)):
+                for device_id, data in updates.items():
+                    if device_id not in self.data:
+                        if self._async_add_device(device_id, data):
+                            added.append(device_id)
+                    else:
+                        self._async_update_device(device_id, data)
+            if added:
+                self._async_signal_devices_changed(added, [])
         else:
             _LOGGER.debug("TYPES OF UPDATES: %s", type(updates))
 
     @callback
-    def async_subscribe_device_id(self, device_id, update_callback):
-        """Add an callback subscriber."""
-        self._subscriptions.setdefault(device_id, []).append(update_callback)
+    def _async_update_device(self, device_id, data):
+        """Merge new data for a device and signal the fields that changed.
+
+        pysecspy hands out its own, in-place mutated dict, so we keep a
+        record per device to diff against.
+        """
+        device = self.data[device_id]
+        changed_fields = device.update(data)
+        if self.history is not None and not HISTORY_FIELDS.isdisjoint(changed_fields):
+            self.history.async_update(device)
+        if self.frames is not None and "event_on" in changed_fields:
+            self.frames.async_update(device)
+        self.async_signal_device_id_update(device_id, changed_fields)
+
+    @callback
+    def _async_add_device(self, device_id, data):
+        """Add a camera new to the integration, return if it was added."""
+        if "name" not in data:
+            # The event stream only knows the number of a camera added to
+            # SecuritySpy since the last device list, fetch the rest first.
+            self._hass.async_create_task(self.async_request_device_refresh(device_id))
+            return False
+        _LOGGER.debug("Adding camera %s", device_id)
+        self.data[device_id] = CameraState(device_id, data)
+        return True
+
+    @callback
+    def _async_remove_devices(self, device_ids):
+        """Forget cameras removed from SecuritySpy."""
+        if not device_ids:
+            return
+        for device_id in device_ids:
+            _LOGGER.debug("Removing camera %s", device_id)
+            del self.data[device_id]
+        self._async_signal_devices_changed([], device_ids)
+
+    @callback
+    def async_subscribe_devices(self, update_callback):
+        """Add a callback called with the cameras added and removed."""
+        self._device_listeners.append(update_callback)
+
+        def _unsubscribe():
+            self._device_listeners.remove(update_callback)
+
+        return _unsubscribe
+
+    @callback
+    def _async_signal_devices_changed(self, added, removed):
+        for update_callback in list(self._device_listeners):
+            update_callback(added, removed)
+
+    @callback
+    def async_subscribe_device_id(self, device_id, update_callback, fields=None):
+        """Add an callback subscriber.
+
+        If fields is given, the callback is only called when one of those
+        device data fields changed. None means any change.
+        """
+        subscription = (update_callback, fields)
+        self._subscriptions.setdefault(device_id, []).append(subscription)
 
         def _unsubscribe():
-            self.async_unsubscribe_device_id(device_id, update_callback)
+            self._async_remove_subscription(device_id, subscription)
+
+        return _unsubscribe
+
+    @callback
+    def async_update_server(self, server_info):
+        """Update the server information."""
+        if self.server.update(server_info):
+            for update_callback in list(self._availability_listeners):
+                update_callback()
+
+    @callback
+    def async_subscribe_availability(self, update_callback):
+        """Add a callback called when the availability or server changes."""
+        self._availability_listeners.append(update_callback)
+
+        def _unsubscribe():
+            self._availability_listeners.remove(update_callback)
 
         return _unsubscribe
 
     @callback
     def async_unsubscribe_device_id(self, device_id, update_callback):
         """Remove a callback subscriber."""
-        self._subscriptions[device_id].remove(update_callback)
+        for subscription in self._subscriptions.get(device_id, ()):
+            if subscription[0] == update_callback:
+                self._async_remove_subscription(device_id, subscription)
+                return
+
+    @callback
+    def _async_remove_subscription(self, device_id, subscription):
+        """Remove a subscription entry."""
+        self._subscriptions[device_id].remove(subscription)
         if not self._subscriptions[device_id]:
             del self._subscriptions[device_id]
 
     @callback
-    def async_signal_device_id_update(self, device_id):
-        """Call the callbacks for a device_id."""
+    def async_signal_device_id_update(self, device_id, changed_fields=None):
+        """Call the callbacks for a device_id.
+
+        Only callbacks subscribed to one of the changed fields are called,
+        changed_fields None calls all of them. Returns (fired, skipped).
+        """
         if not self._subscriptions.get(device_id):
-            return
+            return 0, 0
+
+        start = time.perf_counter()
+        profiler = self.profiler
+        fired = skipped = 0
+        for update_callback, fields in list(self._subscriptions[device_id]):
+            if (
+                changed_fields is None
+                or fields is None
+                or not fields.isdisjoint(changed_fields)
+            ):
+                if profiler.active:
+                    with profiler.span(
+                        _callback_name(update_callback), "entity", device_id=device_id
+                    ):
+                        update_callback()
+                else:
+                    update_callback()
+                fired += 1
+            else:
+                skipped += 1
+
+        self.callbacks_fired += fired
+        self.callbacks_skipped += skipped
+        self.metrics.signal_time.record((time.perf_counter() - start) * 1000)
+        self.metrics.signal_fanout.record(fired)
+        _LOGGER.debug(
+            "Update for device %s: %s callbacks fired, %s skipped",
+            device_id,
+            fired,
+            skipped,
+        )
+        return fired, skipped
+
 
-        for update_callback in self._subscriptions[device_id]:
-            update_callback()
+def _callback_name(update_callback):
+    """Return the entity id, or else the name, of a subscribed callback."""
+    entity_id = getattr(getattr(update_callback, "__self__", None), "entity_id", None)
+    return entity_id or getattr(update_callback, "__qualname__", repr(update_callback))
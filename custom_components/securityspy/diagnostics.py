@@ -0,0 +1,65 @@
+"""Diagnostics support for SecuritySpy."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .session import async_get_session_manager
+
+TO_REDACT = {
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    "server_ip_address",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    secspy_data = entry_data["secspy_data"]
+    hub = entry_data["hub"]
+    supervisor = hub.supervisor
+    frames = secspy_data.frames
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "server": async_redact_data(secspy_data.server.as_dict(), TO_REDACT),
+        "cameras": len(secspy_data.data),
+        "last_update_success": secspy_data.last_update_success,
+        "metrics": secspy_data.metrics.as_dict(),
+        "coordinator": {
+            "callbacks_fired": secspy_data.callbacks_fired,
+            "callbacks_skipped": secspy_data.callbacks_skipped,
+            "ingest": secspy_data.event_coalescer.metrics,
+        },
+        "event_stream": {
+            "entries": hub.refs,
+            "connected": supervisor.connected,
+            "connected_since": supervisor.connected_since.isoformat()
+            if supervisor.connected_since is not None
+            else None,
+            "reconnects": supervisor.reconnects,
+            "failed_attempts": supervisor.failed_attempts,
+            "recovery_time": supervisor.recovery_time,
+        },
+        "session": async_get_session_manager(hass).async_get_stats(
+            entry.data[CONF_HOST], entry.data[CONF_PORT]
+        ),
+        "scaled_images": entry_data["scaled_images"].metrics,
+        "clips": entry_data["clips"].metrics,
+        "ptz": entry_data["ptz"].metrics,
+        "motion_frames": {"fetched": frames.fetched, "errors": frames.errors}
+        if frames is not None
+        else None,
+    }
@@ -1,11 +1,15 @@
 """Shared Entity definition for SecurotySpy Integration."""
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable
 import logging
 
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ATTRIBUTION
+from homeassistant.core import callback
 import homeassistant.helpers.device_registry as dr
 from homeassistant.helpers.entity import Entity, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
     ATTR_BRAND,
@@ -14,6 +18,7 @@ from .const import (
     DOMAIN,
 )
 from .data import SecuritySpyData
+from .models import CameraState, ServerState
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,49 +26,59 @@ _LOGGER = logging.getLogger(__name__)
 class SecuritySpyEntity(Entity):
     """Base class for SecuritySpy entities."""
 
+    _unrecorded_attributes = frozenset({ATTR_BRAND})
+    # Device data fields the state depends on, None for all fields.
+    _update_fields: frozenset[str] | None = None
+
     def __init__(
         self,
         secspy,
         secspy_data: SecuritySpyData,
-        server_info,
+        server_info: ServerState,
         device_id,
         sensor_type,
+        attribute_budget: bool = False,
     ):
-        """Initialize the entity."""
+        """Initialize the entity.
+
+        In attribute budget mode, entities leave out volatile attributes that
+        have entities of their own.
+        """
         super().__init__()
         self.secspy = secspy
         self.secspy_data = secspy_data
         self._device_id = device_id
         self._sensor_type = sensor_type
+        self._attribute_budget = attribute_budget
 
-        self._device_data = self.secspy_data.data[self._device_id]
-        self._device_name = self._device_data["name"]
-        self._mac = f"{self._device_data['ip_address']}_{self._device_id}"
-        self._firmware_version = server_info["server_version"]
-        self._server_id = server_info["server_id"]
-        self._schedule_presets = server_info["schedule_presets"]
-        self._device_type = self._device_data["type"]
-        self._model = self._device_data["model"]
-        self._server_ip = server_info["server_ip_address"]
-        self._server_port = server_info["server_port"]
-
-        self._attr_available = self.secspy_data.last_update_success
+        # Records shared with the other entities, updated in place.
+        self._device: CameraState = self.secspy_data.data[self._device_id]
+        self._server = server_info
+
+        entity_key = self.secspy_data.entity_key or self._server.server_id
         if self._sensor_type is None:
-            self._attr_unique_id = f"{self._device_id}_{self._server_id}"
+            self._attr_unique_id = f"{self._device_id}_{entity_key}"
         else:
             self._attr_unique_id = (
-                f"{self._sensor_type}_{self._server_id}_{self._device_id}"
+                f"{self._sensor_type}_{entity_key}_{self._device_id}"
             )
         self._attr_device_info = DeviceInfo(
-            connections={(dr.CONNECTION_NETWORK_MAC, self._mac)},
-            name=self._device_name,
+            connections={
+                (dr.CONNECTION_NETWORK_MAC, f"{self._device.ip_address}_{self._device_id}")
+            },
+            name=self._device.name,
             manufacturer=DEFAULT_BRAND,
-            model=self._model,
-            sw_version=self._firmware_version,
-            via_device=(DOMAIN, self._server_id),
-            configuration_url=f"http://{self._server_ip}:{self._server_port}/camerasettings?cameraNum={self._device_id}",
+            model=self._device.model,
+            sw_version=self._server.server_version,
+            via_device=(DOMAIN, self._server.server_id),
+            configuration_url=f"http://{self._server.server_ip_address}:{self._server.server_port}/camerasettings?cameraNum={self._device_id}",
         )
 
+    @property
+    def available(self):
+        """Return if data from the server is current."""
+        return self.secspy_data.last_update_success
+
     @property
     def extra_state_attributes(self):
         """Return the device state attributes."""
@@ -74,8 +89,100 @@ class SecuritySpyEntity(Entity):
 
     async def async_added_to_hass(self):
         """When entity is added to hass."""
+        if self._update_fields is not None and not self._update_fields:
+            # Nothing to update from device data, only availability.
+            self.async_on_remove(
+                self.secspy_data.async_subscribe_availability(self.async_write_ha_state)
+            )
+            return
         self.async_on_remove(
             self.secspy_data.async_subscribe_device_id(
-                self._device_id, self.async_write_ha_state
+                self._device_id, self.async_write_ha_state, self._update_fields
             )
         )
+
+
+class SecuritySpyServerEntity(Entity):
+    """Base class for entities of the SecuritySpy server itself."""
+
+    _unrecorded_attributes = frozenset({ATTR_BRAND})
+
+    def __init__(self, secspy_data: SecuritySpyData, server_info: ServerState, key):
+        """Initialize the entity."""
+        super().__init__()
+        self.secspy_data = secspy_data
+        self._server = server_info
+        self._attr_unique_id = (
+            f"{key}_{secspy_data.entity_key or self._server.server_id}"
+        )
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, self._server.server_id)},
+        )
+
+    @property
+    def available(self):
+        """Return if data from the server is current."""
+        return self.secspy_data.last_update_success
+
+    @property
+    def extra_state_attributes(self):
+        """Return the device state attributes."""
+        return {
+            ATTR_ATTRIBUTION: DEFAULT_ATTRIBUTION,
+            ATTR_BRAND: DEFAULT_BRAND,
+        }
+
+    async def async_added_to_hass(self):
+        """When entity is added to hass."""
+        self.async_on_remove(
+            self.secspy_data.async_subscribe_availability(self.async_write_ha_state)
+        )
+
+
+def included_device_ids(entry_data: dict, entity_type: str) -> list[str]:
+    """Return the cameras to create entities of entity_type for.
+
+    Cameras and entity types left out in the options get no entities at
+    all, so they cost nothing to set up or update.
+    """
+    if entity_type not in entry_data["entity_types"]:
+        return []
+    cameras = entry_data["cameras"]
+    return [
+        device_id
+        for device_id in entry_data["secspy_data"].data
+        if not cameras or device_id in cameras
+    ]
+
+
+@callback
+def async_add_camera_entities(
+    entry: ConfigEntry,
+    entry_data: dict,
+    entity_type: str,
+    create_entities: Callable[[list[str]], Iterable[Entity]],
+    async_add_entities: AddEntitiesCallback,
+    update_before_add: bool = False,
+) -> None:
+    """Add the entities of the included cameras, now and as cameras are added.
+
+    Entities of removed cameras are removed from the registry by the entry.
+    """
+    async_add_entities(
+        create_entities(included_device_ids(entry_data, entity_type)),
+        update_before_add,
+    )
+
+    @callback
+    def _async_devices_changed(added, removed):
+        device_ids = [
+            device_id
+            for device_id in included_device_ids(entry_data, entity_type)
+            if device_id in added
+        ]
+        if device_ids:
+            async_add_entities(create_entities(device_ids), update_before_add)
+
+    entry.async_on_unload(
+        entry_data["secspy_data"].async_subscribe_devices(_async_devices_changed)
+    )
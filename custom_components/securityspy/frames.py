@@ -0,0 +1,119 @@
+"""Snapshots taken when motion starts, kept in memory per camera."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+import time
+
+from aiohttp.client_exceptions import ClientError
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+from pysecspy.errors import RequestError
+from pysecspy.secspy_server import SecSpyServer
+
+from .models import CameraState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between snapshots while motion is on.
+FRAME_INTERVAL = 1.0
+
+
+class MotionFrame:
+    """A snapshot taken during a motion event."""
+
+    __slots__ = ("time", "image")
+
+    def __init__(self, timestamp: float, image: bytes) -> None:
+        """Initialize the frame."""
+        self.time = timestamp
+        self.image = image
+
+    def as_dict(self) -> dict:
+        """Return the frame, without the image, for a service response."""
+        return {
+            "time": dt_util.utc_from_timestamp(self.time).isoformat(),
+            "size": len(self.image),
+        }
+
+
+class MotionFrameBuffer:
+    """Fetch snapshots as soon as motion starts and keep the last few.
+
+    A snapshot is taken when an event starts and then every FRAME_INTERVAL
+    while it lasts, up to the size of the ring, so notifications and the
+    camera entity get the images from memory instead of asking the NVR
+    when it is busiest. The ring of a camera holds the frames of its
+    current or last event only.
+    """
+
+    def __init__(self, hass: HomeAssistant, secspy: SecSpyServer, size: int):
+        """Initialize the buffer."""
+        self._hass = hass
+        self._secspy = secspy
+        self.size = size
+        self._rings: dict[str, deque[MotionFrame]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._stopped = False
+
+        self.fetched = 0
+        self.errors = 0
+
+    @callback
+    def async_update(self, device: CameraState) -> None:
+        """Start taking snapshots when motion starts on a camera."""
+        if self._stopped or not device.event_on or device.device_id in self._tasks:
+            return
+        self._tasks[device.device_id] = self._hass.async_create_background_task(
+            self._async_capture(device), f"securityspy frames {device.device_id}"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop taking snapshots and drop the frames."""
+        self._stopped = True
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._rings.clear()
+
+    @callback
+    def async_get_frames(self, device_id: str) -> list[MotionFrame]:
+        """Return the frames of a camera, oldest first."""
+        return list(self._rings.get(device_id, ()))
+
+    @callback
+    def async_get_latest(self, device_id: str, max_age: float) -> bytes | None:
+        """Return the newest frame of a camera if it is at most max_age old."""
+        ring = self._rings.get(device_id)
+        if not ring or time.time() - ring[-1].time > max_age:
+            return None
+        return ring[-1].image
+
+    async def _async_capture(self, device: CameraState) -> None:
+        # A new event starts a new ring, frames of earlier events are dropped.
+        ring = self._rings[device.device_id] = deque(maxlen=self.size)
+        try:
+            for _ in range(self.size):
+                started = time.monotonic()
+                try:
+                    image = await self._secspy.get_snapshot_image(device.device_id)
+                except (RequestError, ClientError, asyncio.TimeoutError) as err:
+                    self.errors += 1
+                    _LOGGER.debug(
+                        "Snapshot for motion on camera %s failed: %s",
+                        device.device_id,
+                        err,
+                    )
+                else:
+                    if image:
+                        self.fetched += 1
+                        ring.append(MotionFrame(time.time(), image))
+                if not device.event_on:
+                    break
+                await asyncio.sleep(
+                    max(FRAME_INTERVAL - (time.monotonic() - started), 0)
+                )
+        finally:
+            self._tasks.pop(device.device_id, None)
@@ -0,0 +1,297 @@
+"""Motion event history for SecuritySpy cameras."""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+import heapq
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import EVENTS_STORAGE_KEY, STORAGE_VERSION
+from .models import CameraState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device data fields that start, classify or end an event.
+HISTORY_FIELDS = frozenset(
+    {
+        "event_on",
+        "event_object",
+        "event_length",
+        "event_score_human",
+        "event_score_vehicle",
+        "event_score_animal",
+    }
+)
+# Seconds to wait before writing the history to disk.
+HISTORY_SAVE_DELAY = 60
+
+
+def _score(value) -> int:
+    """Return a score as a number, pysecspy passes them on as text."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class MotionEvent:
+    """A motion event, updated in place until it ends."""
+
+    __slots__ = (
+        "camera_id",
+        "start",
+        "end",
+        "object",
+        "score_human",
+        "score_vehicle",
+        "score_animal",
+    )
+
+    def __init__(
+        self,
+        camera_id: str,
+        start: float,
+        end: float | None = None,
+        event_object: str | None = None,
+        score_human: int = 0,
+        score_vehicle: int = 0,
+        score_animal: int = 0,
+    ) -> None:
+        """Initialize the event."""
+        self.camera_id = camera_id
+        self.start = start
+        self.end = end
+        self.object = event_object
+        self.score_human = score_human
+        self.score_vehicle = score_vehicle
+        self.score_animal = score_animal
+
+    def as_dict(self) -> dict:
+        """Return the event for a service response."""
+        return {
+            "camera_id": self.camera_id,
+            "start": dt_util.utc_from_timestamp(self.start).isoformat(),
+            "end": dt_util.utc_from_timestamp(self.end).isoformat()
+            if self.end is not None
+            else None,
+            "length": round(self.end - self.start, 3) if self.end is not None else None,
+            "object": self.object,
+            "score_human": self.score_human,
+            "score_vehicle": self.score_vehicle,
+            "score_animal": self.score_animal,
+        }
+
+    def as_tuple(self) -> tuple:
+        """Return the event for storage."""
+        return (
+            self.start,
+            self.end,
+            self.object,
+            self.score_human,
+            self.score_vehicle,
+            self.score_animal,
+        )
+
+
+class _EventIndex:
+    """Events ordered by start time, with their start times for bisect."""
+
+    __slots__ = ("events", "starts")
+
+    def __init__(self) -> None:
+        self.events: list[MotionEvent] = []
+        self.starts: list[float] = []
+
+    def add(self, event: MotionEvent) -> None:
+        if not self.starts or event.start >= self.starts[-1]:
+            self.events.append(event)
+            self.starts.append(event.start)
+            return
+        index = bisect_right(self.starts, event.start)
+        self.events.insert(index, event)
+        self.starts.insert(index, event.start)
+
+    def remove(self, event: MotionEvent) -> None:
+        start = bisect_left(self.starts, event.start)
+        for index in range(start, bisect_right(self.starts, event.start)):
+            if self.events[index] is event:
+                del self.events[index]
+                del self.starts[index]
+                return
+
+    def trim(self, oldest: float) -> None:
+        index = bisect_left(self.starts, oldest)
+        if index:
+            del self.events[:index]
+            del self.starts[:index]
+
+    def between(self, start: float, end: float) -> list[MotionEvent]:
+        return self.events[
+            bisect_left(self.starts, start) : bisect_right(self.starts, end)
+        ]
+
+
+class _CameraHistory:
+    """The events of one camera, indexed by object class."""
+
+    __slots__ = ("all", "by_object", "current")
+
+    def __init__(self) -> None:
+        self.all = _EventIndex()
+        self.by_object: dict[str, _EventIndex] = {}
+        self.current: MotionEvent | None = None
+
+    def add_object(self, event: MotionEvent) -> None:
+        if event.object:
+            self.by_object.setdefault(event.object.lower(), _EventIndex()).add(event)
+
+    def set_object(self, event: MotionEvent, event_object: str) -> None:
+        """Change the object of an event, moving it to the new class index."""
+        if event.object and event.object.lower() == event_object.lower():
+            event.object = event_object
+            return
+        if event.object and (index := self.by_object.get(event.object.lower())):
+            index.remove(event)
+        event.object = event_object
+        self.add_object(event)
+
+
+class EventHistory:
+    """Ring buffer of the latest motion events per camera.
+
+    Events are kept in start time order per camera and per object class,
+    so a query is two binary searches per camera. When a camera has more
+    than max_events events, the oldest are dropped in chunks.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        max_events: int,
+        persist: bool = False,
+    ):
+        """Initialize the history."""
+        self._hass = hass
+        self._max_events = max_events
+        self._cameras: dict[str, _CameraHistory] = {}
+        self._store: Store | None = None
+        if persist:
+            self._store = Store(
+                hass, STORAGE_VERSION, EVENTS_STORAGE_KEY.format(entry_id)
+            )
+
+    async def async_load(self) -> None:
+        """Load the stored events."""
+        if self._store is None or (stored := await self._store.async_load()) is None:
+            return
+        for camera_id, events in stored.items():
+            history = self._cameras.setdefault(camera_id, _CameraHistory())
+            for start, end, event_object, human, vehicle, animal in events[
+                -self._max_events :
+            ]:
+                # An event open when stopping never got its end.
+                event = MotionEvent(
+                    camera_id, start, end or start, event_object, human, vehicle, animal
+                )
+                history.all.add(event)
+                history.add_object(event)
+
+    async def async_stop(self) -> None:
+        """Close open events and save them."""
+        now = time.time()
+        for history in self._cameras.values():
+            if history.current is not None:
+                history.current.end = now
+                history.current = None
+        if self._store is not None:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_update(self, device: CameraState) -> None:
+        """Record the event fields of a camera."""
+        history = self._cameras.get(device.device_id)
+        if history is None:
+            history = self._cameras[device.device_id] = _CameraHistory()
+
+        event = history.current
+        if device.event_on and event is None:
+            event = history.current = MotionEvent(device.device_id, time.time())
+            history.all.add(event)
+            self._async_trim(history)
+        if event is None:
+            return
+
+        # The object is cleared again when the event ends, keep the last one.
+        event_object = device.event_object
+        if event_object not in (None, "None", event.object):
+            history.set_object(event, event_object)
+        event.score_human = max(event.score_human, _score(device.event_score_human))
+        event.score_vehicle = max(
+            event.score_vehicle, _score(device.event_score_vehicle)
+        )
+        event.score_animal = max(event.score_animal, _score(device.event_score_animal))
+
+        if not device.event_on:
+            event.end = time.time()
+            history.current = None
+            self._async_schedule_save()
+
+    @callback
+    def async_query(
+        self,
+        camera_ids: list[str] | None = None,
+        event_object: str | None = None,
+        start: float = 0,
+        end: float = float("inf"),
+        limit: int = 100,
+    ) -> list[MotionEvent]:
+        """Return the newest events matching the query, newest first."""
+        if camera_ids is None:
+            camera_ids = list(self._cameras)
+        matches = []
+        for camera_id in camera_ids:
+            history = self._cameras.get(camera_id)
+            if history is None:
+                continue
+            index = (
+                history.all
+                if event_object is None
+                else history.by_object.get(event_object.lower())
+            )
+            if index is not None:
+                matches.append(index.between(start, end)[-limit:])
+        return heapq.nlargest(
+            limit,
+            (event for events in matches for event in events),
+            key=lambda event: event.start,
+        )
+
+    @callback
+    def _async_trim(self, history: _CameraHistory) -> None:
+        """Drop the oldest events of a camera over the limit."""
+        # Trim a quarter at a time, so the lists are not shifted on every event.
+        if len(history.all.events) <= self._max_events + self._max_events // 4:
+            return
+        oldest = history.all.starts[-self._max_events]
+        history.all.trim(oldest)
+        for index in history.by_object.values():
+            index.trim(oldest)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the events a while after they changed."""
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Return the events to store."""
+        return {
+            camera_id: [event.as_tuple() for event in history.all.events]
+            for camera_id, history in self._cameras.items()
+        }
@@ -0,0 +1,277 @@
+"""One event stream and camera inventory per SecuritySpy server."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import logging
+import time
+
+from aiohttp.client_exceptions import ClientError
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import HomeAssistant, callback
+from pysecspy.const import DEVICE_UPDATE_INTERVAL_SECONDS
+from pysecspy.errors import RequestError
+from pysecspy.secspy_data import PROCESSED_EVENT_EMPTY
+from pysecspy.secspy_server import SecSpyServer
+
+from .const import (
+    CONF_MAX_CONNECTIONS,
+    CONF_MIN_SCORE,
+    CONF_REQUEST_TIMEOUT,
+    DATA_HUBS,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MIN_SCORE,
+    DEFAULT_REQUEST_TIMEOUT,
+)
+from .session import async_get_session_manager
+from .supervisor import StreamSupervisor
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SecuritySpyHub:
+    """Share the event stream and device list of a server between entries.
+
+    The hub has the SecSpyServer methods SecuritySpyData uses, so every
+    config entry for the server gets its own SecuritySpyData on top of one
+    upstream connection. Commands still go through the entry's own server
+    object and credentials. The stream and device list use the credentials
+    of the oldest loaded entry, the owner.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str, entry: ConfigEntry):
+        """Initialize the hub."""
+        self._hass = hass
+        self.key = key
+        self.owner = entry
+        self.secspy = _async_create_server(hass, entry)
+        self.refs = 0
+        self._entries: dict[str, ConfigEntry] = {}
+        self._attached: dict[str, SecSpyServer] = {}
+        self._subscribers: list[Callable[[dict], None]] = []
+        self._unsub_stream: Callable[[], None] | None = None
+        self._update_lock = asyncio.Lock()
+        self._last_device_list: float | None = None
+        self.supervisor = StreamSupervisor(hass, self.secspy, self._async_resync)
+
+    @callback
+    def async_attach(self, entry: ConfigEntry, secspy: SecSpyServer) -> None:
+        """Let the server of an entry send commands for the hub's cameras.
+
+        pysecspy stores the result of set_arm_mode and enable_camera in the
+        server's own device dict, which only update() fills, and entry
+        servers never update. They share the hub's device dict instead.
+        """
+        if not isinstance(getattr(secspy, "_processed_data", None), dict):
+            _LOGGER.warning("This pysecspy version can't share its device list")
+            return
+        secspy._processed_data = self.secspy.devices
+        self._attached[entry.entry_id] = secspy
+
+    @property
+    def server_credential(self) -> dict:
+        """Return the credentials used for the stream and device list."""
+        return self.secspy.server_credential
+
+    def subscribe_websocket(self, ws_callback: Callable[[dict], None]):
+        """Subscribe to the shared event stream.
+
+        Returns a callback that will unsubscribe.
+        """
+        if self._unsub_stream is None:
+            self._unsub_stream = self.secspy.subscribe_websocket(self._dispatch)
+            self.supervisor.async_start()
+        self._subscribers.append(ws_callback)
+
+        def _unsub_ws_callback():
+            self._subscribers.remove(ws_callback)
+
+        return _unsub_ws_callback
+
+    def _dispatch(self, message: dict) -> None:
+        """Hand a stream message to every subscribed entry."""
+        for ws_callback in list(self._subscribers):
+            ws_callback(message)
+
+    async def update(self, force_camera_update=False) -> dict:
+        """Update the device list and return all devices.
+
+        Entries calling at the same time wait for one another, and the
+        later ones are served by the rate limit.
+        """
+        async with self._update_lock:
+            now = time.monotonic()
+            if (
+                force_camera_update
+                or self._last_device_list is None
+                or now - self._last_device_list > DEVICE_UPDATE_INTERVAL_SECONDS
+            ):
+                await self._async_update_device_list()
+                self._last_device_list = now
+            else:
+                # Lets pysecspy check the stream, it fetches nothing here.
+                await self.secspy.update()
+        # An entry joining a running hub needs every device, not just changes.
+        return self.secspy.devices
+
+    async def _async_resync(self) -> None:
+        """Catch up on a reconnected stream with one device update."""
+        async with self._update_lock:
+            await self._async_update_device_list()
+            self._last_device_list = time.monotonic()
+        # Motion that was on when the stream dropped has ended unseen, or
+        # will be reported again.
+        for data in self.secspy.devices.values():
+            if data.get("event_on"):
+                data.update(PROCESSED_EVENT_EMPTY)
+        self._dispatch(self.secspy.devices)
+
+    async def _async_update_device_list(self) -> None:
+        """Fetch the device list and drop the cameras missing from it.
+
+        pysecspy never forgets a camera. Every known camera gets an empty
+        record for the fetch, the ones the device list fills are merged
+        back and the others were removed from SecuritySpy.
+        """
+        devices = self.secspy.devices
+        previous = dict(devices)
+        for device_id in previous:
+            devices[device_id] = {}
+        fetched = False
+        try:
+            await self.secspy.update(force_camera_update=True)
+            fetched = True
+        finally:
+            for device_id, data in list(devices.items()):
+                record = previous.get(device_id)
+                if record is None:
+                    continue
+                if fetched and "name" not in data:
+                    _LOGGER.debug("Camera %s was removed from SecuritySpy", device_id)
+                    del devices[device_id]
+                    continue
+                record.update(data)
+                devices[device_id] = record
+
+    async def async_set_owner(self, entry: ConfigEntry) -> None:
+        """Move the stream and device list to the credentials of an entry."""
+        _LOGGER.debug(
+            "Moving hub for SecuritySpy server %s to entry %s", self.key, entry.title
+        )
+        streaming = self._unsub_stream is not None
+        await self._async_close_stream()
+        old = self.secspy
+        async with self._update_lock:
+            self.owner = entry
+            self.secspy = _async_create_server(self._hass, entry)
+            self.secspy.devices.update(old.devices)
+            for secspy in self._attached.values():
+                secspy._processed_data = self.secspy.devices
+            self.supervisor.secspy = self.secspy
+        _async_release_session(self._hass, old)
+        if not streaming:
+            return
+        self._unsub_stream = self.secspy.subscribe_websocket(self._dispatch)
+        self.supervisor.async_start()
+        try:
+            # The first update of a server opens its stream.
+            await self._async_resync()
+        except (RequestError, ClientError, asyncio.TimeoutError) as err:
+            # The supervisor keeps reconnecting.
+            _LOGGER.debug("Reopening the event stream failed: %s", err)
+
+    async def async_disconnect_ws(self) -> None:
+        """Leave the stream to the hub, it is closed with the last entry."""
+
+    async def async_close(self) -> None:
+        """Close the event stream and release the session."""
+        await self._async_close_stream()
+        _async_release_session(self._hass, self.secspy)
+
+    async def _async_close_stream(self) -> None:
+        """Stop the supervisor and close the event stream."""
+        await self.supervisor.async_stop()
+        if self._unsub_stream is not None:
+            self._unsub_stream()
+            self._unsub_stream = None
+        secspy = self.secspy
+        await secspy.async_disconnect_ws()
+        task = secspy.ws_task
+        if task is not None and not task.done():
+            # pysecspy only closes a stream that is open, not one opening.
+            task.cancel()
+            await asyncio.wait([task])
+        if secspy.ws_session is not None and not secspy.ws_session.closed:
+            await secspy.ws_session.close()
+
+
+@callback
+def _async_create_server(hass: HomeAssistant, entry: ConfigEntry) -> SecSpyServer:
+    """Return a server on a shared session with the credentials of an entry."""
+    session = async_get_session_manager(hass).async_acquire(
+        entry.data[CONF_HOST],
+        entry.data[CONF_PORT],
+        entry.options.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+        entry.options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+    )
+    return SecSpyServer(
+        session,
+        entry.data[CONF_HOST],
+        entry.data[CONF_PORT],
+        entry.data[CONF_USERNAME],
+        entry.data[CONF_PASSWORD],
+        entry.options.get(CONF_MIN_SCORE, DEFAULT_MIN_SCORE),
+    )
+
+
+@callback
+def _async_release_session(hass: HomeAssistant, secspy: SecSpyServer) -> None:
+    """Release the shared session of a server."""
+    credential = secspy.server_credential
+    async_get_session_manager(hass).async_release(
+        credential["host"], credential["port"]
+    )
+
+
+@callback
+def hub_key(entry: ConfigEntry) -> str:
+    """Return the server id of an entry, or its address before it is known."""
+    if entry.unique_id is None:
+        return f"{entry.data[CONF_HOST]}:{entry.data[CONF_PORT]}"
+    # Extra entries for a server have unique ids of <server id>_<username>.
+    return entry.unique_id.split("_", 1)[0]
+
+
+@callback
+def async_acquire_hub(hass: HomeAssistant, entry: ConfigEntry) -> SecuritySpyHub:
+    """Return the hub of the entry's server, creating it if needed."""
+    hubs: dict[str, SecuritySpyHub] = hass.data.setdefault(DATA_HUBS, {})
+    key = hub_key(entry)
+    hub = hubs.get(key)
+    if hub is None:
+        _LOGGER.debug("Creating hub for SecuritySpy server %s", key)
+        hub = hubs[key] = SecuritySpyHub(hass, key, entry)
+    hub._entries[entry.entry_id] = entry
+    hub.refs += 1
+    return hub
+
+
+async def async_release_hub(
+    hass: HomeAssistant, hub: SecuritySpyHub, entry: ConfigEntry
+) -> None:
+    """Release a hub, it is closed when the last entry releases it.
+
+    An entry unloads to change its credentials, so when the owner releases
+    the hub it moves to the credentials of the next entry.
+    """
+    hub.refs -= 1
+    hub._entries.pop(entry.entry_id, None)
+    hub._attached.pop(entry.entry_id, None)
+    if hub.refs > 0:
+        if hub.owner.entry_id == entry.entry_id and hub._entries:
+            await hub.async_set_owner(next(iter(hub._entries.values())))
+        return
+    _LOGGER.debug("Closing hub for SecuritySpy server %s", hub.key)
+    hass.data[DATA_HUBS].pop(hub.key, None)
+    await hub.async_close()
@@ -0,0 +1,159 @@
+"""Websocket event ingestion for SecuritySpy."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .metrics import Histogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds websocket updates are collected before being applied as a batch.
+DEFAULT_BATCH_WINDOW = 0.05
+
+
+class EventCoalescer:
+    """Coalesce websocket updates per camera within a short window.
+
+    Updates for the same camera within the batch window are merged, keeping
+    the last value per field, and all pending cameras are applied together
+    when the window ends. A change of event_on is never merged away, the
+    pending batch is applied first so motion start and end both show up.
+
+    Pending updates are keyed by camera, so they never outgrow the camera
+    list and need no bound of their own.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        process_batch: Callable[[dict], None],
+        window: float = DEFAULT_BATCH_WINDOW,
+        latency: Histogram | None = None,
+    ):
+        """Initialize the coalescer."""
+        self._hass = hass
+        self._process_batch = process_batch
+        self._window = window
+        # Milliseconds from receiving an update to signalling it.
+        self._latency_histogram = latency
+        self._pending: dict[str, dict] = {}
+        self._queued_at: dict[str, float] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._stopped = False
+
+        self.received = 0
+        self.coalesced = 0
+        # Updates that were not a dict of cameras.
+        self.rejected = 0
+        # Pending updates thrown away when stopping.
+        self.discarded = 0
+        self.batches = 0
+        self.max_pending = 0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+        self._latency_total = 0.0
+        self._latency_count = 0
+
+    @property
+    def pending(self) -> int:
+        """Return the number of cameras with pending updates."""
+        return len(self._pending)
+
+    @property
+    def metrics(self) -> dict:
+        """Return the coalescer metrics."""
+        return {
+            "pending_cameras": self.pending,
+            "max_pending_cameras": self.max_pending,
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "discarded": self.discarded,
+            "batches": self.batches,
+            "latency_last_ms": round(self.latency_last * 1000, 3),
+            "latency_avg_ms": round(
+                self._latency_total / self._latency_count * 1000, 3
+            )
+            if self._latency_count
+            else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+        }
+
+    @callback
+    def async_put(self, updates) -> None:
+        """Queue updates from the websocket."""
+        if self._stopped:
+            return
+        if not isinstance(updates, dict):
+            self.rejected += 1
+            return
+
+        for device_id, data in updates.items():
+            self.received += 1
+            pending = self._pending.get(device_id)
+            if pending is not None:
+                if "event_on" in data and data["event_on"] != pending.get(
+                    "event_on", data["event_on"]
+                ):
+                    self.async_flush()
+                else:
+                    # pysecspy reuses its dict, so merge a copy of the values.
+                    pending.update(data)
+                    self.coalesced += 1
+                    continue
+
+            self._pending[device_id] = dict(data)
+            self._queued_at[device_id] = time.monotonic()
+
+        self.max_pending = max(self.max_pending, len(self._pending))
+        if self._pending and self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, self._window, self._async_flush_later
+            )
+
+    @callback
+    def _async_flush_later(self, _now) -> None:
+        """Apply the pending batch when the window ends."""
+        self._unsub_flush = None
+        self.async_flush()
+
+    @callback
+    def async_flush(self) -> None:
+        """Apply all pending updates now."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        queued_at, self._queued_at = self._queued_at, {}
+        self._process_batch(batch)
+
+        now = time.monotonic()
+        self.batches += 1
+        for queued in queued_at.values():
+            latency = now - queued
+            self.latency_last = latency
+            self.latency_max = max(self.latency_max, latency)
+            self._latency_total += latency
+            self._latency_count += 1
+            if self._latency_histogram is not None:
+                self._latency_histogram.record(latency * 1000)
+        _LOGGER.debug("Applied websocket batch for %s cameras", len(batch))
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop accepting updates and drop anything pending."""
+        self._stopped = True
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self.discarded += len(self._pending)
+        self._pending.clear()
+        self._queued_at.clear()
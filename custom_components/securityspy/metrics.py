@@ -0,0 +1,181 @@
+"""Low overhead metrics for the SecuritySpy integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable
+import functools
+import time
+
+from pysecspy.secspy_server import SecSpyServer
+
+from .profile import TraceProfiler
+
+# Bucket upper bounds in milliseconds for latencies.
+LATENCY_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+# Bucket upper bounds for the number of callbacks per device update.
+FANOUT_BOUNDS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+# The SecSpyServer methods the integration calls, update() goes through
+# the hub and is timed by SecuritySpyData.
+SERVER_METHODS = (
+    "enable_camera",
+    "enable_schedule_preset",
+    "get_latest_motion_recording",
+    "get_server_information",
+    "get_snapshot_image",
+    "set_arm_mode",
+    "set_ptz_preset",
+)
+
+
+class Histogram:
+    """Count values in fixed buckets.
+
+    Recording is a bisect and a few additions, percentiles are estimated
+    as the upper bound of the bucket they fall in.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BOUNDS) -> None:
+        """Initialize the histogram."""
+        self.bounds = bounds
+        # The last bucket counts values above the highest bound.
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return the estimated value below which fraction of the values are."""
+        if not self.count:
+            return None
+        wanted = self.count * fraction
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= wanted:
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+    def as_dict(self) -> dict:
+        """Return the histogram for diagnostics."""
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": round(self.max, 3),
+            "buckets": {
+                f"le_{bound}": count
+                for bound, count in zip(self.bounds, self.counts)
+                if count
+            }
+            | ({"inf": self.counts[-1]} if self.counts[-1] else {}),
+        }
+
+
+class Timer:
+    """Record the milliseconds a block takes in a histogram."""
+
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram) -> None:
+        """Initialize the timer."""
+        self._histogram = histogram
+
+    def __enter__(self) -> None:
+        """Start timing."""
+        self._start = time.perf_counter()
+
+    def __exit__(self, *_) -> None:
+        """Record the time taken."""
+        self._histogram.record((time.perf_counter() - self._start) * 1000)
+
+
+class SecuritySpyMetrics:
+    """Histograms and counters of one config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.calls: dict[str, Histogram] = {}
+        self.call_errors: dict[str, int] = {}
+        self.event_latency = Histogram()
+        self.signal_time = Histogram()
+        self.signal_fanout = Histogram(FANOUT_BOUNDS)
+        self.snapshots_served = 0
+        self.snapshot_bytes = 0
+
+    def timer(self, call: str) -> Timer:
+        """Return a timer for a call to SecuritySpy."""
+        histogram = self.calls.get(call)
+        if histogram is None:
+            histogram = self.calls[call] = Histogram()
+        return Timer(histogram)
+
+    def count_error(self, call: str) -> None:
+        """Count a failed call to SecuritySpy."""
+        self.call_errors[call] = self.call_errors.get(call, 0) + 1
+
+    @property
+    def call_latency(self) -> Histogram:
+        """Return the latencies of all calls to SecuritySpy together."""
+        combined = Histogram()
+        for histogram in self.calls.values():
+            combined.counts = [a + b for a, b in zip(combined.counts, histogram.counts)]
+            combined.count += histogram.count
+            combined.total += histogram.total
+            combined.max = max(combined.max, histogram.max)
+        return combined
+
+    def as_dict(self) -> dict:
+        """Return the metrics for diagnostics."""
+        return {
+            "calls_ms": {
+                call: histogram.as_dict() for call, histogram in sorted(self.calls.items())
+            },
+            "call_errors": dict(self.call_errors),
+            "event_to_signal_ms": self.event_latency.as_dict(),
+            "signal_ms": self.signal_time.as_dict(),
+            "signal_fanout": self.signal_fanout.as_dict(),
+            "snapshots_served": self.snapshots_served,
+            "snapshot_bytes": self.snapshot_bytes,
+        }
+
+
+def instrument_server(
+    secspy: SecSpyServer, metrics: SecuritySpyMetrics, profiler: TraceProfiler
+) -> None:
+    """Time every call the integration makes on a SecSpyServer.
+
+    The methods are wrapped on the instance, other SecSpyServer objects
+    are left alone. The calls are also traced while profiling is on.
+    """
+    for name in SERVER_METHODS:
+        setattr(
+            secspy, name, _timed(getattr(secspy, name), name, metrics, profiler)
+        )
+
+
+def _timed(
+    method: Callable, name: str, metrics: SecuritySpyMetrics, profiler: TraceProfiler
+) -> Callable:
+    @functools.wraps(method)
+    async def _timed_call(*args, **kwargs):
+        try:
+            with metrics.timer(name), profiler.async_span(name, "request"):
+                return await method(*args, **kwargs)
+        except Exception:
+            metrics.count_error(name)
+            raise
+
+    return _timed_call
@@ -0,0 +1,151 @@
+"""Live MJPEG preview of SecuritySpy cameras, shared by all viewers."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import aiohttp
+from aiohttp import web
+from homeassistant.const import CONTENT_TYPE_MULTIPART
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+_LOGGER = logging.getLogger(__name__)
+
+# Frames buffered per viewer, older frames are dropped for slow viewers.
+CLIENT_BUFFER = 2
+# Seconds without a frame before the upstream stream is reopened.
+UPSTREAM_READ_TIMEOUT = 30
+# Seconds between attempts to reopen a failed upstream stream.
+UPSTREAM_RETRY_DELAY = 5
+
+BOUNDARY = "--frameboundary"
+
+
+class MjpegClient:
+    """A viewer of an MJPEG stream."""
+
+    def __init__(self):
+        """Initialize the viewer."""
+        self.frames: asyncio.Queue[bytes | None] = asyncio.Queue(CLIENT_BUFFER)
+        self.dropped = 0
+
+    @callback
+    def async_put(self, frame: bytes | None) -> None:
+        """Queue a frame, dropping the oldest one if the viewer lags.
+
+        None ends the stream of the viewer.
+        """
+        if self.frames.full():
+            self.frames.get_nowait()
+            self.dropped += 1
+        self.frames.put_nowait(frame)
+
+
+class MjpegBroadcaster:
+    """Fan one MJPEG stream from SecuritySpy out to any number of viewers.
+
+    The upstream stream is opened for the first viewer and closed when the
+    last one leaves, so the load on the NVR does not grow with the viewers.
+    """
+
+    def __init__(self, hass: HomeAssistant, url: str):
+        """Initialize the broadcaster."""
+        self._hass = hass
+        self.url = url
+        self._clients: set[MjpegClient] = set()
+        self._task: asyncio.Task | None = None
+
+        self.upstream_connects = 0
+        self.frames = 0
+        self.dropped = 0
+
+    @property
+    def metrics(self) -> dict:
+        """Return the broadcaster metrics."""
+        return {
+            "viewers": len(self._clients),
+            "upstream_open": self._task is not None,
+            "upstream_connects": self.upstream_connects,
+            "frames": self.frames,
+            "frames_dropped": self.dropped
+            + sum(client.dropped for client in self._clients),
+        }
+
+    async def async_handle_request(self, request: web.Request) -> web.StreamResponse:
+        """Serve the stream to a viewer until it disconnects."""
+        response = web.StreamResponse()
+        response.content_type = CONTENT_TYPE_MULTIPART.format(BOUNDARY)
+        await response.prepare(request)
+
+        client = self._async_add_client()
+        try:
+            while True:
+                if (frame := await client.frames.get()) is None:
+                    break
+                await response.write(
+                    f"{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(frame)}\r\n\r\n".encode()
+                    + frame
+                    + b"\r\n"
+                )
+        except ConnectionError:
+            pass
+        finally:
+            self._async_remove_client(client)
+        return response
+
+    @callback
+    def async_stop(self) -> None:
+        """Close the upstream stream and end the streams of all viewers."""
+        for client in self._clients:
+            client.async_put(None)
+        self._clients.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @callback
+    def _async_add_client(self) -> MjpegClient:
+        client = MjpegClient()
+        self._clients.add(client)
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run_upstream(), "securityspy mjpeg upstream"
+            )
+        return client
+
+    @callback
+    def _async_remove_client(self, client: MjpegClient) -> None:
+        self._clients.discard(client)
+        self.dropped += client.dropped
+        if not self._clients and self._task is not None:
+            _LOGGER.debug("Last viewer left, closing the MJPEG stream")
+            self._task.cancel()
+            self._task = None
+
+    async def _async_run_upstream(self) -> None:
+        """Read frames from SecuritySpy while there are viewers."""
+        # A stream holds its connection, so it stays out of the pooled
+        # session used for requests.
+        session = async_get_clientsession(self._hass, verify_ssl=False)
+        while self._clients:
+            try:
+                await self._async_read_upstream(session)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("MJPEG stream failed: %s", err)
+            await asyncio.sleep(UPSTREAM_RETRY_DELAY)
+
+    async def _async_read_upstream(self, session: aiohttp.ClientSession) -> None:
+        self.upstream_connects += 1
+        async with session.get(
+            self.url,
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=UPSTREAM_READ_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            reader = aiohttp.MultipartReader.from_response(response)
+            while (part := await reader.next()) is not None:
+                frame = await part.read()
+                self.frames += 1
+                for client in self._clients:
+                    client.async_put(frame)
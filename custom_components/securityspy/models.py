@@ -3,6 +3,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from .const import DEVICE_TYPE_FIELDS
+
 
 @dataclass(frozen=True, kw_only=True)
 class SecSpyRequiredKeysMixin:
@@ -10,3 +12,166 @@ class SecSpyRequiredKeysMixin:
 
     trigger_field: str | None = None
     device_type: str | None = None
+    update_fields: tuple[str, ...] = ()
+    # Device data fields shown as attributes, left out in attribute budget mode.
+    attribute_fields: tuple[str, ...] = ()
+
+    def subscribed_fields(self, attribute_budget: bool = False) -> frozenset[str]:
+        """Return the device data fields the entity state depends on."""
+        fields = set(self.update_fields)
+        if not attribute_budget:
+            fields.update(self.attribute_fields)
+        if self.trigger_field is not None:
+            fields.add(self.trigger_field)
+        fields.update(DEVICE_TYPE_FIELDS.get(self.device_type, ()))
+        return frozenset(fields)
+
+
+# Camera fields by group, each group has its own version counter.
+CAMERA_FIELD_GROUPS: dict[str, tuple[str, ...]] = {
+    "info": (
+        "name",
+        "type",
+        "model",
+        "ip_address",
+        "server_id",
+        "live_stream",
+        "latest_image",
+        "image_width",
+        "image_height",
+        "video_format",
+        "ptz_capabilities",
+        "ptz_presets",
+    ),
+    "status": ("online", "enabled", "fps", "event_online"),
+    "recording": ("recording_mode_a", "recording_mode_c", "recording_mode_m"),
+    "event": (
+        "last_motion",
+        "event_on",
+        "event_type",
+        "event_start",
+        "event_length",
+        "event_object",
+        "event_score_human",
+        "event_score_vehicle",
+        "event_score_animal",
+    ),
+}
+CAMERA_FIELDS = {
+    field: f"{group}_version"
+    for group, fields in CAMERA_FIELD_GROUPS.items()
+    for field in fields
+}
+
+_MISSING = object()
+
+
+class CameraState:
+    """The state of a camera, shared by all entities of the camera.
+
+    Known pysecspy fields are slots, anything else goes in extra. Every
+    change increases the version of the field group, so a reader can tell
+    whether a group changed since it last looked.
+    """
+
+    __slots__ = (
+        "device_id",
+        "extra",
+        *CAMERA_FIELDS,
+        *(f"{group}_version" for group in CAMERA_FIELD_GROUPS),
+    )
+
+    def __init__(self, device_id: str, data: dict | None = None) -> None:
+        """Initialize the record."""
+        self.device_id = device_id
+        self.extra: dict | None = None
+        for field in CAMERA_FIELDS:
+            setattr(self, field, None)
+        for group in CAMERA_FIELD_GROUPS:
+            setattr(self, f"{group}_version", 0)
+        if data:
+            self.update(data)
+
+    def get(self, field: str, default=None):
+        """Return a field by name."""
+        if field in CAMERA_FIELDS:
+            return getattr(self, field)
+        if self.extra is None:
+            return default
+        return self.extra.get(field, default)
+
+    def version(self, group: str) -> int:
+        """Return the version of a field group."""
+        return getattr(self, f"{group}_version")
+
+    def update(self, data: dict) -> set[str]:
+        """Merge pysecspy device data and return the fields that changed."""
+        changed = set()
+        versions = set()
+        for field, value in data.items():
+            version = CAMERA_FIELDS.get(field)
+            if version is None:
+                if self.extra is None:
+                    self.extra = {}
+                if self.extra.get(field, _MISSING) != value:
+                    self.extra[field] = value
+                    changed.add(field)
+            elif getattr(self, field) != value:
+                setattr(self, field, value)
+                changed.add(field)
+                versions.add(version)
+        for version in versions:
+            setattr(self, version, getattr(self, version) + 1)
+        return changed
+
+    def as_dict(self) -> dict:
+        """Return the fields as pysecspy device data."""
+        data = {field: getattr(self, field) for field in CAMERA_FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class ServerState:
+    """The state of a SecuritySpy server."""
+
+    __slots__ = (
+        "server_name",
+        "server_version",
+        "server_id",
+        "server_ip_address",
+        "server_port",
+        "schedule_presets",
+        "version",
+    )
+
+    def __init__(self, data: dict | None = None) -> None:
+        """Initialize the record."""
+        self.server_name: str | None = None
+        self.server_version: str | None = None
+        self.server_id: str | None = None
+        self.server_ip_address: str | None = None
+        self.server_port: int | None = None
+        self.schedule_presets: list = []
+        self.version = 0
+        if data:
+            self.update(data)
+
+    def update(self, data: dict) -> set[str]:
+        """Merge pysecspy server information and return the fields that changed."""
+        changed = {
+            field
+            for field in self.__slots__
+            if field != "version" and field in data and getattr(self, field) != data[field]
+        }
+        for field in changed:
+            setattr(self, field, data[field])
+        if changed:
+            self.version += 1
+        return changed
+
+    def as_dict(self) -> dict:
+        """Return the fields as pysecspy server information."""
+        return {
+            field: getattr(self, field) for field in self.__slots__ if field != "version"
+        }
@@ -0,0 +1,233 @@
+"""Opt-in trace of the work the integration does."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import nullcontext
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_PROFILER, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_EVENTS = 100_000
+
+# Returned by the span helpers while profiling is off.
+_NO_SPAN = nullcontext()
+
+
+class _Span:
+    """Record a complete event for a block run on one thread."""
+
+    __slots__ = ("_profiler", "_name", "_category", "_args", "_start")
+
+    def __init__(self, profiler: TraceProfiler, name: str, category: str, args):
+        """Initialize the span."""
+        self._profiler = profiler
+        self._name = name
+        self._category = category
+        self._args = args
+
+    def __enter__(self) -> None:
+        """Start the span."""
+        self._start = time.perf_counter()
+
+    def __exit__(self, *_) -> None:
+        """Record the span."""
+        profiler = self._profiler
+        event = {
+            "name": self._name,
+            "cat": self._category,
+            "ph": "X",
+            "ts": profiler.timestamp(self._start),
+            "dur": round((time.perf_counter() - self._start) * 1_000_000, 1),
+        }
+        if self._args:
+            event["args"] = self._args
+        profiler.add(event)
+
+
+class _AsyncSpan:
+    """Record a begin and an end event for a block that awaits.
+
+    Blocks that await interleave on the event loop thread, so they are
+    recorded as async events with an id instead of nested spans.
+    """
+
+    __slots__ = ("_profiler", "_name", "_category", "_id")
+
+    def __init__(self, profiler: TraceProfiler, name: str, category: str):
+        """Initialize the span."""
+        self._profiler = profiler
+        self._name = name
+        self._category = category
+
+    def __enter__(self) -> None:
+        """Record the begin event."""
+        self._id = self._profiler.next_id()
+        self._add("b")
+
+    def __exit__(self, *_) -> None:
+        """Record the end event."""
+        self._add("e")
+
+    def _add(self, phase: str) -> None:
+        profiler = self._profiler
+        profiler.add(
+            {
+                "name": self._name,
+                "cat": self._category,
+                "ph": phase,
+                "id": self._id,
+                "ts": profiler.timestamp(time.perf_counter()),
+            }
+        )
+
+
+class TraceProfiler:
+    """Record timing spans in the Chrome trace format while profiling is on.
+
+    Every hook checks active before doing anything, so the integration
+    pays one attribute lookup per hook while profiling is off. The trace
+    opens in chrome://tracing, Perfetto and speedscope.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the profiler."""
+        self._hass = hass
+        self.active = False
+        self.filename: str | None = None
+        self.sample_rate = 1.0
+        self.max_events = DEFAULT_MAX_EVENTS
+        self.dropped = 0
+        self._events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._started = 0.0
+        self._last_id = 0
+        self._pid = os.getpid()
+
+    @callback
+    def async_start(
+        self,
+        filename: str,
+        max_events: int = DEFAULT_MAX_EVENTS,
+        sample_rate: float = 1.0,
+    ) -> None:
+        """Start recording spans."""
+        self.filename = filename
+        self.max_events = max_events
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._events = []
+        self._threads = {}
+        self._started = time.perf_counter()
+        self.active = True
+        _LOGGER.info("Profiling SecuritySpy to %s", filename)
+
+    async def async_stop(self) -> dict:
+        """Stop recording and write the trace file."""
+        self.active = False
+        filename = self.filename
+        events = self._events
+        trace = {
+            "traceEvents": self._thread_names() + events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "integration": DOMAIN,
+                "sample_rate": self.sample_rate,
+                "dropped_events": self.dropped,
+            },
+        }
+        self._events = []
+        await self._hass.async_add_executor_job(_write_trace, filename, trace)
+        _LOGGER.info("Profile of SecuritySpy written to %s", filename)
+        return {"filename": filename, "events": len(events), "dropped": self.dropped}
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop recording and drop the spans."""
+        self.active = False
+        self._events = []
+
+    def span(self, name: str, category: str, **args) -> _Span | nullcontext:
+        """Return a context manager timing a block that does not await."""
+        if not self.active or not self._sampled():
+            return _NO_SPAN
+        return _Span(self, name, category, args)
+
+    def async_span(self, name: str, category: str) -> _AsyncSpan | nullcontext:
+        """Return a context manager timing a block that awaits."""
+        if not self.active or not self._sampled():
+            return _NO_SPAN
+        return _AsyncSpan(self, name, category)
+
+    def wrap(self, func: Callable, name: str, category: str) -> Callable:
+        """Return func timed as a span, or func itself if profiling is off."""
+        if not self.active:
+            return func
+
+        @functools.wraps(func)
+        def _profiled(*args, **kwargs):
+            with self.span(name, category):
+                return func(*args, **kwargs)
+
+        return _profiled
+
+    def timestamp(self, perf_time: float) -> float:
+        """Return a perf_counter time in microseconds since profiling started."""
+        return round((perf_time - self._started) * 1_000_000, 1)
+
+    def next_id(self) -> int:
+        """Return an id for an async span."""
+        self._last_id += 1
+        return self._last_id
+
+    def add(self, event: dict) -> None:
+        """Add an event of the current thread, may be called from any thread."""
+        if not self.active:
+            return
+        if len(self._events) >= self.max_events:
+            self.dropped += 1
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        event["pid"] = self._pid
+        event["tid"] = tid
+        self._events.append(event)
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def _thread_names(self) -> list[dict]:
+        return [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self._threads.items()
+        ]
+
+
+def _write_trace(filename: str, trace: dict) -> None:
+    """Executor helper to write the trace file."""
+    with open(filename, "w", encoding="utf-8") as _file:
+        json.dump(trace, _file, separators=(",", ":"))
+
+
+@callback
+def async_get_profiler(hass: HomeAssistant) -> TraceProfiler:
+    """Return the profiler, creating it on first use."""
+    if DATA_PROFILER not in hass.data:
+        hass.data[DATA_PROFILER] = TraceProfiler(hass)
+    return hass.data[DATA_PROFILER]
@@ -0,0 +1,255 @@
+"""PTZ commands for SecuritySpy cameras."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from aiohttp.client_exceptions import ClientError
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from pysecspy.errors import RequestError
+
+from .models import CameraState
+
+_LOGGER = logging.getLogger(__name__)
+
+# SecuritySpy PTZ command numbers of the directional moves.
+PTZ_MOVES = {
+    "Left": 1,
+    "Right": 2,
+    "Up": 3,
+    "Down": 4,
+    "Zoom In": 5,
+    "Zoom Out": 6,
+    "Stop": 99,
+}
+# Presets are the commands from 12 and up, in the order of the preset list.
+PTZ_PRESET_OFFSET = 12
+PTZ_MOVE_SPEED = 40
+PTZ_PRESET_SPEED = 80
+PTZ_STOP = PTZ_MOVES["Stop"]
+# Minimum seconds between two commands to the same camera.
+PTZ_MIN_INTERVAL = 0.3
+
+
+def ptz_supported(device: CameraState) -> bool:
+    """Return True if the camera can pan, tilt or zoom."""
+    return int(device.ptz_capabilities or 0) > 0
+
+
+def ptz_options(device: CameraState) -> list[str]:
+    """Return the presets and moves of a camera."""
+    return [*device.ptz_presets, *PTZ_MOVES]
+
+
+def ptz_command(device: CameraState, option: str) -> tuple[int, int] | None:
+    """Return the command number and default speed for a preset or move.
+
+    Matching ignores case, and underscores match spaces, so zoom_in is the
+    same as Zoom In.
+    """
+    wanted = option.replace("_", " ").casefold()
+    for index, preset in enumerate(device.ptz_presets):
+        if preset.casefold() == wanted:
+            return PTZ_PRESET_OFFSET + index, PTZ_PRESET_SPEED
+    for move, command in PTZ_MOVES.items():
+        if move.casefold() == wanted:
+            return command, PTZ_MOVE_SPEED
+    return None
+
+
+class PTZScheduler:
+    """Send the PTZ commands of one camera, the latest command wins.
+
+    Commands queued while another one is waiting replace it, and commands
+    are sent at most once per min_interval. A timed move is followed by a
+    Stop command, unless another command arrives first.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        secspy,
+        device_id: str,
+        min_interval: float = PTZ_MIN_INTERVAL,
+    ):
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._secspy = secspy
+        self._device_id = device_id
+        self._min_interval = min_interval
+        # (command, speed, duration, queued at)
+        self._pending: tuple[int, int, float | None, float] | None = None
+        self._task: asyncio.Task | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+        self._last_sent = 0.0
+
+        self.queued = 0
+        self.collapsed = 0
+        self.sent = 0
+        self.failed = 0
+        self.timed_stops = 0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+        self._latency_total = 0.0
+
+    @property
+    def metrics(self) -> dict:
+        """Return the scheduler metrics."""
+        return {
+            "queued": self.queued,
+            "collapsed": self.collapsed,
+            "sent": self.sent,
+            "failed": self.failed,
+            "timed_stops": self.timed_stops,
+            "latency_last_ms": round(self.latency_last * 1000, 3),
+            "latency_avg_ms": round(self._latency_total / self.sent * 1000, 3)
+            if self.sent
+            else 0.0,
+            "latency_max_ms": round(self.latency_max * 1000, 3),
+        }
+
+    @callback
+    def async_queue(
+        self, command: int, speed: int, duration: float | None = None
+    ) -> None:
+        """Queue a command, replacing a command that is still waiting."""
+        self.queued += 1
+        if self._pending is not None:
+            self.collapsed += 1
+        self._pending = (command, speed, duration, time.monotonic())
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_send_pending(), f"securityspy ptz {self._device_id}"
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Drop waiting commands and timers."""
+        self._pending = None
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_send_pending(self) -> None:
+        """Send queued commands until none are waiting."""
+        try:
+            while self._pending is not None:
+                wait = self._last_sent + self._min_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                command, speed, duration, queued_at = self._pending
+                self._pending = None
+                if self._unsub_stop is not None:
+                    # A newer command replaces the timed move.
+                    self._unsub_stop()
+                    self._unsub_stop = None
+                await self._async_send(command, speed, queued_at)
+                if duration and command != PTZ_STOP:
+                    self._unsub_stop = async_call_later(
+                        self._hass, duration, self._async_timed_stop
+                    )
+        finally:
+            self._task = None
+
+    async def _async_send(self, command: int, speed: int, queued_at: float) -> None:
+        """Send one command and record its latency."""
+        try:
+            await self._secspy.set_ptz_preset(self._device_id, command, speed)
+        except (RequestError, ClientError, asyncio.TimeoutError) as err:
+            self.failed += 1
+            _LOGGER.error(
+                "PTZ command %s failed for Camera %s: %s",
+                command,
+                self._device_id,
+                err,
+            )
+        else:
+            self.sent += 1
+            latency = time.monotonic() - queued_at
+            self.latency_last = latency
+            self.latency_max = max(self.latency_max, latency)
+            self._latency_total += latency
+        self._last_sent = time.monotonic()
+
+    @callback
+    def _async_timed_stop(self, _now) -> None:
+        """Stop a timed move."""
+        self._unsub_stop = None
+        self.timed_stops += 1
+        self.async_queue(PTZ_STOP, PTZ_MOVE_SPEED)
+
+
+class SecuritySpyPTZ:
+    """Hand out the PTZ schedulers of a SecuritySpy server."""
+
+    def __init__(self, hass: HomeAssistant, secspy):
+        """Initialize the schedulers."""
+        self._hass = hass
+        self._secspy = secspy
+        self._schedulers: dict[str, PTZScheduler] = {}
+
+    @property
+    def metrics(self) -> dict:
+        """Return the metrics of the schedulers per camera."""
+        return {
+            device_id: scheduler.metrics
+            for device_id, scheduler in self._schedulers.items()
+        }
+
+    @callback
+    def async_get_scheduler(self, device_id: str) -> PTZScheduler:
+        """Return the scheduler of a camera, creating it on first use."""
+        scheduler = self._schedulers.get(device_id)
+        if scheduler is None:
+            scheduler = self._schedulers[device_id] = PTZScheduler(
+                self._hass, self._secspy, device_id
+            )
+        return scheduler
+
+    @callback
+    def async_move(
+        self,
+        device: CameraState,
+        option: str,
+        speed: int | None = None,
+        duration: float | None = None,
+    ) -> bool:
+        """Queue a move to a preset or in a direction.
+
+        Returns False if the camera has no such preset or move.
+        """
+        command = ptz_command(device, option)
+        if command is None:
+            _LOGGER.error(
+                "Unknown PTZ command %s for Camera %s, valid options are: %s",
+                option,
+                device.name,
+                ", ".join(ptz_options(device)),
+            )
+            return False
+        command_id, default_speed = command
+        self.async_send(device.device_id, command_id, speed or default_speed, duration)
+        return True
+
+    @callback
+    def async_send(
+        self,
+        device_id: str,
+        command: int,
+        speed: int,
+        duration: float | None = None,
+    ) -> None:
+        """Queue a command by number."""
+        _LOGGER.debug("Queueing PTZ command %s for Camera %s", command, device_id)
+        self.async_get_scheduler(device_id).async_queue(command, speed, duration)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop all schedulers."""
+        for scheduler in self._schedulers.values():
+            scheduler.async_stop()
@@ -0,0 +1,199 @@
+"""Recording downloads for SecuritySpy cameras."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from datetime import datetime
+import logging
+import os
+import tempfile
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from pysecspy.errors import RequestError
+from pysecspy.secspy_server import SecSpyServer
+import xmltodict
+
+from .const import DEFAULT_REQUEST_TIMEOUT, EVENT_DOWNLOAD_PROGRESS
+
+_LOGGER = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Data held in memory per download before it is handed to the executor.
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+# Long clips take a while, so only time out when the NVR stops sending.
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_read=DEFAULT_REQUEST_TIMEOUT)
+
+
+class SecuritySpyRecordings:
+    """Stream recordings from a SecuritySpy server to disk."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        secspy: SecSpyServer,
+        semaphore: asyncio.Semaphore,
+    ):
+        """Initialize the downloader."""
+        self._hass = hass
+        self._secspy = secspy
+        self._semaphore = semaphore
+        credential = secspy.server_credential
+        self._base_url = f"http://{credential['host']}:{credential['port']}"
+        self._token = credential["token"]
+
+    async def async_get_latest_motion_recording_url(self, camera_id) -> str | None:
+        """Return the download url of the latest recording, if any."""
+        file_uri = (
+            f"{self._base_url}/download?cameraNum={camera_id}&mcFilesCheck=1"
+            f"&ageText=1&results=1&format=xml&auth={self._token}"
+        )
+        response = await self._secspy.req.get(file_uri, ssl=False)
+        if response.status != 200:
+            raise RequestError(
+                f"Fetching Recording files failed: {response.status} - Reason: {response.reason}"
+            )
+        feed = xmltodict.parse(await response.read()).get("feed") or {}
+        entry = feed.get("entry")
+        if isinstance(entry, list):
+            entry = entry[0] if entry else None
+        if entry is None:
+            return None
+        return f"{self._base_url}/{entry['link']['@href']}?auth={self._token}"
+
+    async def async_list_motion_recordings(
+        self,
+        camera_id,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """Return the motion recordings of a camera, newest first.
+
+        Without start and end the newest recordings are returned.
+        """
+        file_uri = (
+            f"{self._base_url}/download?cameraNum={camera_id}&mcFilesCheck=1"
+            f"&ageText=1&results={limit}&format=xml"
+            f"{_date_query(1, start)}{_date_query(2, end)}&auth={self._token}"
+        )
+        response = await self._secspy.req.get(file_uri, ssl=False)
+        if response.status != 200:
+            raise RequestError(
+                f"Fetching Recording files failed: {response.status} - Reason: {response.reason}"
+            )
+        feed = xmltodict.parse(await response.read()).get("feed") or {}
+        entries = feed.get("entry") or []
+        if isinstance(entries, dict):
+            entries = [entries]
+        return [
+            {
+                "path": entry["link"]["@href"],
+                "title": entry.get("title"),
+                "updated": entry.get("updated"),
+            }
+            for entry in entries[:limit]
+        ]
+
+    async def async_download_recording(self, path, filename) -> None:
+        """Stream the recording at a path on the server to filename."""
+        async with self._semaphore:
+            await self._async_stream_to_file(
+                f"{self._base_url}/{path}?auth={self._token}", filename
+            )
+
+    async def async_download_latest_motion_recording(
+        self, camera_id, filename, entity_id=None
+    ) -> bool:
+        """Stream the latest recording to filename.
+
+        Returns False if the camera has no recording.
+        """
+        video_uri = await self.async_get_latest_motion_recording_url(camera_id)
+        if video_uri is None:
+            return False
+
+        async with self._semaphore:
+            await self._async_stream_to_file(video_uri, filename, entity_id)
+        return True
+
+    async def _async_stream_to_file(self, uri, filename, entity_id=None):
+        """Write the response body to a temp file and move it into place."""
+        async with self._secspy.req.get(
+            uri, ssl=False, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            if response.status != 200:
+                raise RequestError(
+                    f"Fetching Video Recording failed: {response.status} - Reason: {response.reason}"
+                )
+            total = response.content_length
+            progress = {
+                "entity_id": entity_id,
+                "filename": filename,
+                "bytes_written": 0,
+                "total_bytes": total,
+                "done": False,
+            }
+            add_job = self._hass.async_add_executor_job
+            temp_file = await add_job(_open_temp_file, filename)
+            try:
+                buffer = bytearray()
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    buffer += chunk
+                    if len(buffer) < DOWNLOAD_BUFFER_SIZE:
+                        continue
+                    await add_job(temp_file.write, bytes(buffer))
+                    progress["bytes_written"] += len(buffer)
+                    buffer.clear()
+                    if entity_id is not None:
+                        self._hass.bus.async_fire(
+                            EVENT_DOWNLOAD_PROGRESS, dict(progress)
+                        )
+                if buffer:
+                    await add_job(temp_file.write, bytes(buffer))
+                    progress["bytes_written"] += len(buffer)
+                await add_job(_finish_temp_file, temp_file, filename)
+            except BaseException:
+                await add_job(_discard_temp_file, temp_file)
+                raise
+
+        progress["done"] = True
+        if entity_id is not None:
+            self._hass.bus.async_fire(EVENT_DOWNLOAD_PROGRESS, progress)
+        _LOGGER.debug(
+            "Recording of %s bytes written to %s", progress["bytes_written"], filename
+        )
+
+
+def _date_query(number: int, value: datetime | None) -> str:
+    """Return the download query of a date field, in the server's time zone."""
+    if value is None:
+        return ""
+    value = dt_util.as_local(value)
+    return (
+        f"&date{number}Y={value.year}&date{number}M={value.month}"
+        f"&date{number}D={value.day}&date{number}H={value.hour}"
+        f"&date{number}Min={value.minute}"
+    )
+
+
+def _open_temp_file(filename):
+    """Executor helper to open a temp file next to filename."""
+    directory, name = os.path.split(os.path.abspath(filename))
+    return tempfile.NamedTemporaryFile(
+        prefix=f".{name}.", suffix=".part", dir=directory, delete=False
+    )
+
+
+def _finish_temp_file(temp_file, filename):
+    """Executor helper to close the temp file and atomically rename it."""
+    temp_file.close()
+    os.replace(temp_file.name, filename)
+
+
+def _discard_temp_file(temp_file):
+    """Executor helper to close and remove the temp file."""
+    temp_file.close()
+    with contextlib.suppress(OSError):
+        os.remove(temp_file.name)
@@ -0,0 +1,92 @@
+"""Support for SecuritySpy PTZ control."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.select import SelectEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, ENTITY_TYPE_PTZ
+from .entity import SecuritySpyEntity, async_add_camera_entities
+from .ptz import ptz_options, ptz_supported
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """SecuritySpy Select Platform."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    secspy_object = entry_data["nvr"]
+    secspy_data = entry_data["secspy_data"]
+    server_info = entry_data["server_info"]
+    ptz = entry_data["ptz"]
+
+    @callback
+    def _async_create_entities(device_ids):
+        selects = []
+        for device_id in device_ids:
+            device_data = secspy_data.data[device_id]
+            if ptz_supported(device_data):
+                selects.append(
+                    SecuritySpyPTZSelect(
+                        secspy_object, secspy_data, server_info, device_id, ptz
+                    )
+                )
+                _LOGGER.debug(
+                    "Adding PTZ select entity for Camera %s", device_data.name
+                )
+        return selects
+
+    async_add_camera_entities(
+        entry, entry_data, ENTITY_TYPE_PTZ, _async_create_entities, async_add_entities
+    )
+
+
+class SecuritySpyPTZSelect(SecuritySpyEntity, SelectEntity):
+    """Move a PTZ camera to a preset or in a direction."""
+
+    _update_fields = frozenset({"ptz_presets"})
+    # Queue metrics change with every command, keep them out of the recorder.
+    _unrecorded_attributes = SecuritySpyEntity._unrecorded_attributes | frozenset(
+        {
+            "queued",
+            "collapsed",
+            "sent",
+            "failed",
+            "timed_stops",
+            "latency_last_ms",
+            "latency_avg_ms",
+            "latency_max_ms",
+        }
+    )
+
+    def __init__(self, secspy_object, secspy_data, server_info, device_id, ptz):
+        """Initialize the Select entity."""
+        super().__init__(secspy_object, secspy_data, server_info, device_id, "ptz")
+        self._ptz = ptz
+        self._attr_name = f"{self._device.name} PTZ"
+        self._attr_icon = "mdi:pan"
+        self._attr_current_option = None
+
+    @property
+    def options(self) -> list[str]:
+        """Return the presets and moves."""
+        return ptz_options(self._device)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the PTZ queue metrics."""
+        return {
+            **super().extra_state_attributes,
+            **self._ptz.async_get_scheduler(self._device_id).metrics,
+        }
+
+    async def async_select_option(self, option: str) -> None:
+        """Queue the PTZ command."""
+        if self._ptz.async_move(self._device, option):
+            self._attr_current_option = option
+            self.async_write_ha_state()
@@ -1,30 +1,45 @@
 """This component provides Sensors for SecuritySpy."""
 from __future__ import annotations
 
+from collections.abc import Callable
 from dataclasses import dataclass
 import logging
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
+    SensorStateClass,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
+import homeassistant.helpers.entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from .entity import SecuritySpyEntity
+from .entity import (
+    SecuritySpyEntity,
+    SecuritySpyServerEntity,
+    async_add_camera_entities,
+)
 
 from .const import (
+    ATTR_EVENT_LENGTH,
     ATTR_EVENT_SCORE_ANIMAL,
     ATTR_EVENT_SCORE_HUMAN,
     ATTR_EVENT_SCORE_VEHICLE,
+    ATTR_PRESET_ID,
     DEVICE_CLASS_DETECTION,
     DOMAIN,
+    ENTITY_TYPE_SENSOR,
     RECORDING_TYPE_ACTION,
     RECORDING_TYPE_CONTINUOUS,
     RECORDING_TYPE_MOTION,
 )
+from .metrics import SecuritySpyMetrics
 from .models import SecSpyRequiredKeysMixin
+from .supervisor import StreamSupervisor
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -56,6 +71,131 @@ SENSOR_ENTITIES: tuple[SecuritySpyEntityDescription, ...] = (
         name="Detected Object",
         icon="mdi:selection-search",
         device_type=DEVICE_CLASS_DETECTION,
+        attribute_fields=(
+            ATTR_EVENT_SCORE_ANIMAL,
+            ATTR_EVENT_SCORE_HUMAN,
+            ATTR_EVENT_SCORE_VEHICLE,
+        ),
+    ),
+)
+# Event values that are attributes, unless in attribute budget mode.
+EVENT_SENSOR_ENTITIES: tuple[SecuritySpyEntityDescription, ...] = (
+    SecuritySpyEntityDescription(
+        key="event_length",
+        name="Event Length",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        trigger_field=ATTR_EVENT_LENGTH,
+    ),
+    SecuritySpyEntityDescription(
+        key="score_human",
+        name="Human Score",
+        icon="mdi:human",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        trigger_field=ATTR_EVENT_SCORE_HUMAN,
+    ),
+    SecuritySpyEntityDescription(
+        key="score_vehicle",
+        name="Vehicle Score",
+        icon="mdi:car",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        trigger_field=ATTR_EVENT_SCORE_VEHICLE,
+    ),
+    SecuritySpyEntityDescription(
+        key="score_animal",
+        name="Animal Score",
+        icon="mdi:paw",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        trigger_field=ATTR_EVENT_SCORE_ANIMAL,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SecuritySpyStreamSensorDescription(SensorEntityDescription):
+    """Describes a sensor of the SecuritySpy event stream."""
+
+    value_fn: Callable[[StreamSupervisor], Any]
+
+
+STREAM_SENSOR_ENTITIES: tuple[SecuritySpyStreamSensorDescription, ...] = (
+    SecuritySpyStreamSensorDescription(
+        key="stream_connected_since",
+        name="Event Stream Connected Since",
+        icon="mdi:lan-connect",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda supervisor: supervisor.connected_since,
+    ),
+    SecuritySpyStreamSensorDescription(
+        key="stream_reconnects",
+        name="Event Stream Reconnects",
+        icon="mdi:lan-pending",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda supervisor: supervisor.reconnects,
+    ),
+    SecuritySpyStreamSensorDescription(
+        key="stream_recovery_time",
+        name="Event Stream Recovery Time",
+        icon="mdi:timer-sync-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda supervisor: supervisor.recovery_time,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SecuritySpyMetricsSensorDescription(SensorEntityDescription):
+    """Describes a sensor of the SecuritySpy integration metrics."""
+
+    value_fn: Callable[[SecuritySpyMetrics], Any]
+
+
+METRICS_SENSOR_ENTITIES: tuple[SecuritySpyMetricsSensorDescription, ...] = (
+    SecuritySpyMetricsSensorDescription(
+        key="request_latency",
+        name="Request Latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.call_latency.percentile(0.9),
+    ),
+    SecuritySpyMetricsSensorDescription(
+        key="request_errors",
+        name="Request Errors",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: sum(metrics.call_errors.values()),
+    ),
+    SecuritySpyMetricsSensorDescription(
+        key="event_latency",
+        name="Event Latency",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.event_latency.percentile(0.9),
+    ),
+    SecuritySpyMetricsSensorDescription(
+        key="snapshot_bytes",
+        name="Snapshot Data Served",
+        icon="mdi:image-multiple-outline",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEGABYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.snapshot_bytes,
     ),
 )
 _LOGGER = logging.getLogger(__name__)
@@ -69,30 +209,70 @@ async def async_setup_entry(
     secspy_object = entry_data["nvr"]
     secspy_data = entry_data["secspy_data"]
     server_info = entry_data["server_info"]
-    if not secspy_data.data:
-        return
-
-    sensors = []
-    for description in SENSOR_ENTITIES:
-        for device_id in secspy_data.data:
-            device_data = secspy_data.data[device_id]
-            sensors.append(
-                SecuritySpySensor(
-                    secspy_object,
-                    secspy_data,
-                    server_info,
-                    device_id,
-                    description,
-                )
-            )
-            _LOGGER.debug(
-                "Adding sensor entity %s for Camera %s",
-                description.name,
-                device_data["name"],
-            )
+    attribute_budget = entry_data["attribute_budget"]
+
+    sensors = [SecuritySpySchedulePresetsSensor(secspy_data, server_info)]
+    sensors.extend(
+        SecuritySpyStreamSensor(
+            secspy_data, server_info, entry_data["hub"].supervisor, description
+        )
+        for description in STREAM_SENSOR_ENTITIES
+    )
+    sensors.extend(
+        SecuritySpyMetricsSensor(secspy_data, server_info, description)
+        for description in METRICS_SENSOR_ENTITIES
+    )
+
+    if attribute_budget:
+        descriptions = SENSOR_ENTITIES + EVENT_SENSOR_ENTITIES
+    else:
+        descriptions = SENSOR_ENTITIES
+        # Drop event sensors left from attribute budget mode.
+        event_keys = tuple(
+            f"{description.key}_" for description in EVENT_SENSOR_ENTITIES
+        )
+        entity_registry = er.async_get(hass)
+        for registry_entry in er.async_entries_for_config_entry(
+            entity_registry, entry.entry_id
+        ):
+            if registry_entry.domain == "sensor" and registry_entry.unique_id.startswith(
+                event_keys
+            ):
+                entity_registry.async_remove(registry_entry.entity_id)
 
     async_add_entities(sensors)
 
+    @callback
+    def _async_create_entities(device_ids):
+        camera_sensors = []
+        for description in descriptions:
+            for device_id in device_ids:
+                device_data = secspy_data.data[device_id]
+                camera_sensors.append(
+                    SecuritySpySensor(
+                        secspy_object,
+                        secspy_data,
+                        server_info,
+                        device_id,
+                        description,
+                        attribute_budget,
+                    )
+                )
+                _LOGGER.debug(
+                    "Adding sensor entity %s for Camera %s",
+                    description.name,
+                    device_data.name,
+                )
+        return camera_sensors
+
+    async_add_camera_entities(
+        entry,
+        entry_data,
+        ENTITY_TYPE_SENSOR,
+        _async_create_entities,
+        async_add_entities,
+    )
+
 
 class SecuritySpySensor(SecuritySpyEntity, SensorEntity):
     """A SecuritySpy Sensor."""
@@ -104,39 +284,141 @@ class SecuritySpySensor(SecuritySpyEntity, SensorEntity):
         server_info,
         device_id,
         description: SecuritySpyEntityDescription,
+        attribute_budget=False,
     ):
         """Initialize an Unifi Protect sensor."""
         super().__init__(
-            secspy_object, secspy_data, server_info, device_id, description.key
+            secspy_object,
+            secspy_data,
+            server_info,
+            device_id,
+            description.key,
+            attribute_budget,
         )
+        self.entity_description = description
         self._description = description
-        self._attr_name = f"{self._device_data['name']} {self._description.name}"
+        self._update_fields = description.subscribed_fields(attribute_budget)
+        self._attr_name = f"{self._device.name} {self._description.name}"
         self._attr_icon = self._description.icon
-        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        if description.state_class is None:
+            self._attr_entity_category = EntityCategory.DIAGNOSTIC
 
     @property
     def native_value(self):
         """Return the state of the sensor."""
         if self._description.device_type == RECORDING_TYPE_ACTION:
-            return self._device_data["recording_mode_a"]
+            return self._device.recording_mode_a
         if self._description.device_type == RECORDING_TYPE_CONTINUOUS:
-            return self._device_data["recording_mode_c"]
+            return self._device.recording_mode_c
         if self._description.device_type == RECORDING_TYPE_MOTION:
-            return self._device_data["recording_mode_m"]
+            return self._device.recording_mode_m
         if self._description.device_type == DEVICE_CLASS_DETECTION:
-            return self._device_data["event_object"]
+            return self._device.event_object
+        if self._description.trigger_field is not None:
+            # pysecspy passes scores on as text.
+            try:
+                return float(self._device.get(self._description.trigger_field))
+            except (TypeError, ValueError):
+                return None
         return None
 
     @property
     def extra_state_attributes(self):
         """Return the device state attributes."""
-        if self._description.device_type == DEVICE_CLASS_DETECTION:
-            return {
-                **super().extra_state_attributes,
-                ATTR_EVENT_SCORE_ANIMAL: self._device_data[ATTR_EVENT_SCORE_ANIMAL],
-                ATTR_EVENT_SCORE_HUMAN: self._device_data[ATTR_EVENT_SCORE_HUMAN],
-                ATTR_EVENT_SCORE_VEHICLE: self._device_data[ATTR_EVENT_SCORE_VEHICLE],
-            }
+        attributes = {
+            **super().extra_state_attributes,
+        }
+        if not self._attribute_budget:
+            for field in self._description.attribute_fields:
+                attributes[field] = self._device.get(field)
+        return attributes
+
+
+class SecuritySpySchedulePresetsSensor(SecuritySpyServerEntity, SensorEntity):
+    """The schedule presets of a SecuritySpy server."""
+
+    _unrecorded_attributes = SecuritySpyServerEntity._unrecorded_attributes | frozenset(
+        {ATTR_PRESET_ID}
+    )
+
+    def __init__(self, secspy_data, server_info):
+        """Initialize the sensor."""
+        super().__init__(secspy_data, server_info, "schedule_presets")
+        self._attr_name = f"{self._server.server_name} Schedule Presets"
+        self._attr_icon = "mdi:calendar-clock"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_value(self):
+        """Return the number of schedule presets."""
+        return len(self._server.schedule_presets)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the schedule presets."""
         return {
             **super().extra_state_attributes,
+            ATTR_PRESET_ID: self._server.schedule_presets,
         }
+
+
+class SecuritySpyStreamSensor(SecuritySpyServerEntity, SensorEntity):
+    """A sensor of the event stream of a SecuritySpy server."""
+
+    entity_description: SecuritySpyStreamSensorDescription
+
+    def __init__(
+        self,
+        secspy_data,
+        server_info,
+        supervisor: StreamSupervisor,
+        description: SecuritySpyStreamSensorDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(secspy_data, server_info, description.key)
+        self.entity_description = description
+        self._supervisor = supervisor
+        self._attr_name = f"{self._server.server_name} {description.name}"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def available(self):
+        """Return True, the stream state is known while the server is down."""
+        return True
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self._supervisor)
+
+    async def async_added_to_hass(self):
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._supervisor.async_add_listener(self.async_write_ha_state)
+        )
+
+
+class SecuritySpyMetricsSensor(SecuritySpyServerEntity, SensorEntity):
+    """A sensor of the integration metrics of a SecuritySpy server."""
+
+    entity_description: SecuritySpyMetricsSensorDescription
+    # The metrics change with every request, so they are polled.
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        secspy_data,
+        server_info,
+        description: SecuritySpyMetricsSensorDescription,
+    ):
+        """Initialize the sensor."""
+        super().__init__(secspy_data, server_info, description.key)
+        self.entity_description = description
+        self._attr_name = f"{self._server.server_name} {description.name}"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.secspy_data.metrics)
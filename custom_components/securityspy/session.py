@@ -0,0 +1,203 @@
+"""Shared HTTP sessions for SecuritySpy servers."""
+from __future__ import annotations
+
+import logging
+import time
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DATA_SESSION_MANAGER,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_REQUEST_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds idle keep-alive connections to the NVR are kept open.
+KEEPALIVE_TIMEOUT = 60
+# Seconds an unused session is kept, so reloads and the config flow reuse it.
+SESSION_RELEASE_DELAY = 300
+
+
+class PooledSession:
+    """An aiohttp session with its own connection pool and statistics."""
+
+    def __init__(self, max_connections: int, request_timeout: float):
+        """Initialize the session."""
+        self.params = (max_connections, request_timeout)
+        self.refs = 0
+        self.unsub_close: CALLBACK_TYPE | None = None
+        self.requests = 0
+        self.request_errors = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_reuseconn)
+
+        self.connector = aiohttp.TCPConnector(
+            limit=max_connections,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            enable_cleanup_closed=True,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=self.connector,
+            # Recordings can take minutes to download in one request, so
+            # only connecting and waiting for data are limited.
+            timeout=aiohttp.ClientTimeout(
+                total=None, sock_connect=request_timeout, sock_read=request_timeout
+            ),
+            headers={"User-Agent": SERVER_SOFTWARE},
+            trace_configs=[trace_config],
+        )
+
+    @property
+    def stats(self) -> dict:
+        """Return the pool statistics."""
+        # aiohttp has no public api for the pool size.
+        idle = sum(len(conns) for conns in getattr(self.connector, "_conns", {}).values())
+        active = len(getattr(self.connector, "_acquired", ()))
+        return {
+            "references": self.refs,
+            "connection_limit": self.connector.limit,
+            "open_connections": active + idle,
+            "idle_connections": idle,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "requests": self.requests,
+            "request_errors": self.request_errors,
+            "waits": self.wait_count,
+            "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3)
+            if self.wait_count
+            else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+    async def _on_request_start(self, session, ctx, params) -> None:
+        self.requests += 1
+
+    async def _on_request_exception(self, session, ctx, params) -> None:
+        self.request_errors += 1
+
+    async def _on_queued_start(self, session, ctx, params) -> None:
+        ctx.queued_at = time.monotonic()
+
+    async def _on_queued_end(self, session, ctx, params) -> None:
+        waited = time.monotonic() - ctx.queued_at
+        self.wait_count += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    async def _on_create_end(self, session, ctx, params) -> None:
+        self.connections_created += 1
+
+    async def _on_reuseconn(self, session, ctx, params) -> None:
+        self.connections_reused += 1
+
+
+class SecuritySpySessionManager:
+    """Hand out one pooled session per SecuritySpy host and port."""
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the manager."""
+        self._hass = hass
+        self._sessions: dict[tuple[str, int], PooledSession] = {}
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_all)
+
+    @callback
+    def async_acquire(
+        self,
+        host: str,
+        port: int,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ) -> aiohttp.ClientSession:
+        """Return the session for a server, creating it if needed.
+
+        A session in use by another entry is shared as it is, pool settings
+        only change when nobody holds the session.
+        """
+        key = (host, port)
+        pooled = self._sessions.get(key)
+        if (
+            pooled is not None
+            and pooled.refs == 0
+            and pooled.params != (max_connections, request_timeout)
+        ):
+            self._async_close(key)
+            pooled = None
+        if pooled is None:
+            _LOGGER.debug("Creating session pool for %s:%s", host, port)
+            pooled = self._sessions[key] = PooledSession(
+                max_connections, request_timeout
+            )
+        if pooled.unsub_close is not None:
+            pooled.unsub_close()
+            pooled.unsub_close = None
+        pooled.refs += 1
+        return pooled.session
+
+    @callback
+    def async_release(self, host: str, port: int) -> None:
+        """Release a session, it is closed a while after the last release."""
+        key = (host, port)
+        pooled = self._sessions.get(key)
+        if pooled is None or pooled.refs == 0:
+            return
+        pooled.refs -= 1
+        if pooled.refs == 0:
+
+            @callback
+            def _async_close_unused(_now):
+                pooled.unsub_close = None
+                if self._sessions.get(key) is pooled and pooled.refs == 0:
+                    self._async_close(key)
+
+            pooled.unsub_close = async_call_later(
+                self._hass, SESSION_RELEASE_DELAY, _async_close_unused
+            )
+
+    @callback
+    def async_get_stats(self, host: str, port: int) -> dict | None:
+        """Return the pool statistics for a server."""
+        pooled = self._sessions.get((host, port))
+        return pooled.stats if pooled is not None else None
+
+    @callback
+    def _async_close(self, key: tuple[str, int]) -> None:
+        """Close and forget a session."""
+        pooled = self._sessions.pop(key)
+        if pooled.unsub_close is not None:
+            pooled.unsub_close()
+        _LOGGER.debug("Closing session pool for %s:%s", *key)
+        self._hass.async_create_task(pooled.session.close())
+
+    async def _async_close_all(self, _event: Event) -> None:
+        """Close all sessions when Home Assistant stops."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for pooled in sessions:
+            if pooled.unsub_close is not None:
+                pooled.unsub_close()
+            await pooled.session.close()
+
+
+@callback
+def async_get_session_manager(hass: HomeAssistant) -> SecuritySpySessionManager:
+    """Return the session manager, creating it on first use."""
+    if DATA_SESSION_MANAGER not in hass.data:
+        hass.data[DATA_SESSION_MANAGER] = SecuritySpySessionManager(hass)
+    return hass.data[DATA_SESSION_MANAGER]
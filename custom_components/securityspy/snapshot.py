@@ -0,0 +1,209 @@
+"""Snapshot image cache for SecuritySpy cameras."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+import logging
+import time
+
+from homeassistant.components.camera.img_util import (
+    JPEG_QUALITY,
+    TurboJPEGSingleton,
+    find_supported_scaling_factor,
+)
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bytes of scaled snapshots kept per config entry.
+SCALED_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+class SnapshotCache:
+    """Cache snapshot images per requested size.
+
+    Images are kept for ttl seconds and concurrent requests for the same
+    size share a single fetch from the NVR. Fetches are keyed by
+    generation, so requests made after invalidate() never join a fetch
+    started before it.
+    """
+
+    def __init__(self, hass: HomeAssistant, ttl: float):
+        """Initialize the cache."""
+        self._hass = hass
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._images: dict[tuple, tuple[float, bytes]] = {}
+        # Shared fetches keyed by (generation, key).
+        self._pending: dict[tuple, asyncio.Task] = {}
+        self._generation = 0
+
+    async def async_get(
+        self, key: tuple, fetch: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Return the cached image for key, fetching it if needed."""
+        cached = self._images.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self.hits += 1
+            return cached[1]
+
+        pending_key = (self._generation, key)
+        task = self._pending.get(pending_key)
+        if task is None:
+            self.misses += 1
+            task = self._hass.async_create_task(
+                self._async_fetch(pending_key, fetch)
+            )
+            self._pending[pending_key] = task
+        else:
+            self.hits += 1
+
+        # Shield so a cancelled caller does not cancel the shared fetch.
+        return await asyncio.shield(task)
+
+    async def _async_fetch(
+        self, pending_key: tuple, fetch: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Fetch an image and store it, unless invalidated meanwhile."""
+        generation, key = pending_key
+        try:
+            image = await fetch()
+        finally:
+            self._pending.pop(pending_key, None)
+        if image is not None and generation == self._generation:
+            self._images[key] = (time.monotonic(), image)
+        return image
+
+    def invalidate(self) -> None:
+        """Drop all cached images."""
+        _LOGGER.debug("Invalidating %s cached snapshots", len(self._images))
+        self._images.clear()
+        self._generation += 1
+
+
+def scale_image(image: bytes, width: int | None, height: int | None) -> bytes | None:
+    """Scale a JPEG image down to about the requested size.
+
+    Runs in the executor. Returns None when libturbojpeg is not available,
+    and the image itself when it can not be scaled.
+    """
+    turbo_jpeg = TurboJPEGSingleton.instance()
+    if not turbo_jpeg:
+        return None
+    try:
+        current_width, current_height, _, _ = turbo_jpeg.decode_header(image)
+    except OSError:
+        return image
+    # The frontend mostly asks for a width only.
+    if height is None:
+        height = current_height * width // current_width
+    elif width is None:
+        width = current_width * height // current_height
+    scaling_factor = find_supported_scaling_factor(
+        current_width, current_height, width, height
+    )
+    if scaling_factor is None:
+        return image
+    return turbo_jpeg.scale_with_quality(
+        image, scaling_factor=scaling_factor, quality=JPEG_QUALITY
+    )
+
+
+class ScaledImageCache:
+    """Scale snapshots locally and keep the results in an LRU.
+
+    The cache is bounded by the bytes of the images it holds. Requests for
+    the same image and size at the same time share one scaling job.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_bytes: int = SCALED_CACHE_MAX_BYTES):
+        """Initialize the cache."""
+        self._hass = hass
+        self.max_bytes = max_bytes
+        self.size = 0
+        # None until the first scaling job found out if libturbojpeg works.
+        self.available: bool | None = None
+        self._images: OrderedDict[tuple, bytes] = OrderedDict()
+        self._pending: dict[tuple, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.encode_count = 0
+        self.encode_time_total = 0.0
+        self.encode_time_max = 0.0
+
+    @property
+    def metrics(self) -> dict:
+        """Return the cache metrics."""
+        return {
+            "local_scaling": self.available,
+            "images": len(self._images),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "encodes": self.encode_count,
+            "encode_avg_ms": round(
+                self.encode_time_total / self.encode_count * 1000, 3
+            )
+            if self.encode_count
+            else 0.0,
+            "encode_max_ms": round(self.encode_time_max * 1000, 3),
+        }
+
+    async def async_get(
+        self, key: tuple, image: bytes, width: int | None, height: int | None
+    ) -> bytes | None:
+        """Return image scaled to width and height, None if not possible.
+
+        The key names the camera, the image itself is part of the cache key.
+        """
+        key = (*key, hash(image), width, height)
+        scaled = self._images.get(key)
+        if scaled is not None:
+            self.hits += 1
+            self._images.move_to_end(key)
+            return scaled
+
+        future = self._pending.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = self._pending[key] = self._hass.async_create_task(
+            self._async_scale(key, image, width, height)
+        )
+        return await asyncio.shield(future)
+
+    async def _async_scale(
+        self, key: tuple, image: bytes, width: int | None, height: int | None
+    ) -> bytes | None:
+        start = time.monotonic()
+        try:
+            scaled = await self._hass.async_add_executor_job(
+                scale_image, image, width, height
+            )
+        finally:
+            self._pending.pop(key, None)
+        self.available = scaled is not None
+        if scaled is None:
+            return None
+
+        elapsed = time.monotonic() - start
+        self.encode_count += 1
+        self.encode_time_total += elapsed
+        self.encode_time_max = max(self.encode_time_max, elapsed)
+
+        if len(scaled) <= self.max_bytes:
+            self._images[key] = scaled
+            self.size += len(scaled)
+            while self.size > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return scaled
@@ -0,0 +1,196 @@
+"""Keep the SecuritySpy event stream connected."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from datetime import datetime
+import logging
+import random
+import time
+
+from aiohttp.client_exceptions import ClientError
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.util.dt as dt_util
+from pysecspy.errors import RequestError
+from pysecspy.secspy_server import SecSpyServer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between checks of the event stream.
+HEARTBEAT_INTERVAL = 10
+# Seconds without any data, keep-alive lines included, before the stream
+# counts as stalled.
+HEARTBEAT_TIMEOUT = 60
+# Seconds to wait for the stream to open.
+CONNECT_TIMEOUT = 15
+# Reconnect delays in seconds, doubled after every failed attempt.
+RECONNECT_MIN_DELAY = 5
+RECONNECT_MAX_DELAY = 300
+
+
+class StreamSupervisor:
+    """Detect a dropped or stalled event stream and reconnect it.
+
+    pysecspy only opens the stream from update() and never notices when it
+    goes quiet. The supervisor watches the bytes received, reopens the
+    stream with jittered exponential backoff and then calls resync to fill
+    in what was missed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        secspy: SecSpyServer,
+        resync: Callable[[], Awaitable[None]],
+    ):
+        """Initialize the supervisor."""
+        self._hass = hass
+        self.secspy = secspy
+        self._resync = resync
+        self._task: asyncio.Task | None = None
+        self._listeners: list[Callable[[], None]] = []
+        self._received = -1
+        self._last_received = 0.0
+        self._disconnected_at: float | None = None
+
+        self.connected_since: datetime | None = None
+        self.reconnects = 0
+        self.failed_attempts = 0
+        self.recovery_time: float | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Return if the event stream is open."""
+        connection = self.secspy.ws_connection
+        task = self.secspy.ws_task
+        return (
+            connection is not None
+            and not connection.closed
+            and task is not None
+            and not task.done()
+        )
+
+    @callback
+    def async_start(self) -> None:
+        """Start watching the event stream."""
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), "securityspy event stream supervisor"
+            )
+
+    async def async_stop(self) -> None:
+        """Stop watching the event stream."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]):
+        """Add a callback called when the connection state changes."""
+        self._listeners.append(update_callback)
+
+        def _remove_listener():
+            self._listeners.remove(update_callback)
+
+        return _remove_listener
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def _async_run(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            if not self._async_check():
+                await self._async_reconnect()
+
+    @callback
+    def _async_check(self) -> bool:
+        """Return False if the stream dropped or stalled."""
+        now = time.monotonic()
+        if self.connected:
+            received = self.secspy.ws_connection.content.total_bytes
+            if received != self._received:
+                self._received = received
+                self._last_received = now
+                if self.connected_since is None:
+                    self.connected_since = dt_util.utcnow()
+                    self._async_notify()
+                return True
+            if now - self._last_received < HEARTBEAT_TIMEOUT:
+                return True
+            _LOGGER.warning(
+                "No data on the SecuritySpy event stream for %ss, reconnecting",
+                round(now - self._last_received),
+            )
+        elif self.connected_since is not None:
+            _LOGGER.warning("SecuritySpy event stream closed, reconnecting")
+        else:
+            _LOGGER.debug("SecuritySpy event stream not open, connecting")
+
+        self._disconnected_at = now
+        if self.connected_since is not None:
+            self.connected_since = None
+            self._async_notify()
+        return False
+
+    async def _async_reconnect(self) -> None:
+        """Reopen the stream until it succeeds, then resync."""
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            try:
+                await self._async_open_stream()
+                await self._resync()
+            except (RequestError, ClientError, asyncio.TimeoutError) as err:
+                self.failed_attempts += 1
+                _LOGGER.debug("Reconnecting the event stream failed: %s", err)
+            else:
+                break
+            # Jitter keeps many entries from retrying in lockstep.
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+        now = time.monotonic()
+        self.reconnects += 1
+        self.recovery_time = round(now - self._disconnected_at, 3)
+        self.connected_since = dt_util.utcnow()
+        self._received = self.secspy.ws_connection.content.total_bytes
+        self._last_received = now
+        _LOGGER.info(
+            "SecuritySpy event stream reconnected after %ss", self.recovery_time
+        )
+        self._async_notify()
+
+    async def _async_open_stream(self) -> None:
+        """Close what is left of the stream and open it again."""
+        secspy = self.secspy
+        if secspy.ws_connection is not None:
+            secspy.ws_connection.close()
+        task = secspy.ws_task
+        if task is not None and not task.done():
+            # The reader cleans up after itself, let it finish before the
+            # new reader starts or it closes the new connection.
+            task.cancel()
+            await asyncio.wait([task], timeout=CONNECT_TIMEOUT)
+        secspy.ws_connection = None
+        # pysecspy closes its stream session on disconnect but keeps using it.
+        if secspy.ws_session is not None and secspy.ws_session.closed:
+            secspy.ws_session = None
+
+        await secspy.async_connect_ws()
+        task = secspy.ws_task
+        async with asyncio.timeout(CONNECT_TIMEOUT):
+            while secspy.ws_connection is None:
+                if task.done():
+                    err = None if task.cancelled() else task.exception()
+                    raise RequestError(f"Event stream closed: {err}") from err
+                await asyncio.sleep(0.1)
+        if secspy.ws_connection.status != 200:
+            raise RequestError(
+                f"Event stream failed: {secspy.ws_connection.status}"
+            )
@@ -1,22 +1,27 @@
 """This component provides Switches for SecuritySpy."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass
 
+from aiohttp.client_exceptions import ClientError
 from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from pysecspy.errors import RequestError
 
 from .const import (
+    DEVICE_TYPE_FIELDS,
     DOMAIN,
+    ENTITY_TYPE_SWITCH,
     RECORDING_TYPE_ACTION,
     RECORDING_TYPE_CONTINUOUS,
     RECORDING_TYPE_MOTION,
 )
-from .entity import SecuritySpyEntity
+from .entity import SecuritySpyEntity, async_add_camera_entities
 from .models import SecSpyRequiredKeysMixin
 
 
@@ -56,25 +61,33 @@ async def async_setup_entry(
     secspy_object = entry_data["nvr"]
     secspy_data = entry_data["secspy_data"]
     server_info = entry_data["server_info"]
-    if not secspy_data.data:
-        return
-
-    switches = []
-    for description in SWITCH_ENTITIES:
-        for device_id in secspy_data.data:
-            device_data = secspy_data.data[device_id]
-            switches.append(
-                SecuritySpySwitch(
-                    secspy_object, secspy_data, server_info, device_id, description
+
+    @callback
+    def _async_create_entities(device_ids):
+        switches = []
+        for description in SWITCH_ENTITIES:
+            for device_id in device_ids:
+                device_data = secspy_data.data[device_id]
+                switches.append(
+                    SecuritySpySwitch(
+                        secspy_object, secspy_data, server_info, device_id, description
+                    )
                 )
-            )
-            _LOGGER.debug(
-                "Adding switch entity %s for Camera %s",
-                description.name,
-                device_data["name"],
-            )
+                _LOGGER.debug(
+                    "Adding switch entity %s for Camera %s",
+                    description.name,
+                    device_data.name,
+                )
+        return switches
 
-    async_add_entities(switches, True)
+    async_add_camera_entities(
+        entry,
+        entry_data,
+        ENTITY_TYPE_SWITCH,
+        _async_create_entities,
+        async_add_entities,
+        True,
+    )
 
 
 class SecuritySpySwitch(SecuritySpyEntity, SwitchEntity):
@@ -93,7 +106,8 @@ class SecuritySpySwitch(SecuritySpyEntity, SwitchEntity):
             secspy_object, secspy_data, server_info, device_id, description.key
         )
         self._description = description
-        self._attr_name = f"{self._device_data['name']} {self._description.name}"
+        self._update_fields = description.subscribed_fields()
+        self._attr_name = f"{self._device.name} {self._description.name}"
         self._attr_icon = self._description.icon
         self._attr_entity_category = EntityCategory.CONFIG
 
@@ -101,33 +115,42 @@ class SecuritySpySwitch(SecuritySpyEntity, SwitchEntity):
     def is_on(self):
         """Return true if device is on."""
         if self._description.device_type == RECORDING_TYPE_ACTION:
-            return self._device_data["recording_mode_a"]
+            return self._device.recording_mode_a
         if self._description.device_type == RECORDING_TYPE_MOTION:
-            return self._device_data["recording_mode_m"]
+            return self._device.recording_mode_m
         if self._description.device_type == RECORDING_TYPE_CONTINUOUS:
-            return self._device_data["recording_mode_c"]
+            return self._device.recording_mode_c
 
     async def async_turn_on(self, **kwargs):
         """Turn the device on."""
         if self._description.device_type == RECORDING_TYPE_ACTION:
             _LOGGER.debug("Turning on Actions")
-            await self.secspy.set_arm_mode(self._device_id, RECORDING_TYPE_ACTION, True)
         if self._description.device_type == RECORDING_TYPE_MOTION:
             _LOGGER.debug("Turning on Motion Recording")
-            await self.secspy.set_arm_mode(self._device_id, RECORDING_TYPE_MOTION, True)
         if self._description.device_type == RECORDING_TYPE_CONTINUOUS:
             _LOGGER.debug("Turning on Continuous Recording")
-            await self.secspy.set_arm_mode(
-                self._device_id, RECORDING_TYPE_CONTINUOUS, True
-            )
-
-        await self.secspy_data.async_refresh(force_camera_update=True)
+        await self._async_set_arm_mode(True)
 
     async def async_turn_off(self, **kwargs):
         """Turn the device off."""
         _LOGGER.debug("Turning off Action or Recording")
-        await self.secspy.set_arm_mode(
-            self._device_id, self._description.device_type, False
-        )
+        await self._async_set_arm_mode(False)
 
-        await self.secspy_data.async_refresh(force_camera_update=True)
+    async def _async_set_arm_mode(self, enabled):
+        """Send the arm mode, the state only changes if SecuritySpy took it."""
+        try:
+            await self.secspy.set_arm_mode(
+                self._device_id, self._description.device_type, enabled
+            )
+        except (RequestError, ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.error(
+                "Could not turn %s %s: %s", "on" if enabled else "off", self.name, err
+            )
+            return
+        await self._async_toggled(enabled)
+
+    async def _async_toggled(self, enabled):
+        """Show the new state right away and refresh the camera."""
+        (field,) = DEVICE_TYPE_FIELDS[self._description.device_type]
+        self.secspy_data.async_set_device_field(self._device_id, field, enabled)
+        await self.secspy_data.async_request_device_refresh(self._device_id)